@@ -0,0 +1,454 @@
+"""
+Offline load test for every router.
+
+Boots `main.app` in-process, with local stand-ins for everything it talks to:
+- MongoDB: a local mongod (--mongo-uri), or mongomock-motor (--in-memory).
+- Google OAuth and Drive: a fake HTTP server (benchmarks/stubs.py).
+- The AI webhook: a fake server with configurable latency (--ai-latency).
+- SMTP: a local sink that accepts and discards mail.
+
+It seeds realistic data, drives each endpoint with --concurrency workers, and
+writes a JSON report with throughput and p50/p95/p99 per endpoint.
+
+Usage (from the repository root):
+    python -m benchmarks.load_test --mongo-uri mongodb://localhost:27017 \\
+        --results 100000 --requests 500 --concurrency 20 --output run.json
+    python -m benchmarks.load_test ... --baseline run.json   # prints deltas vs. an earlier run
+
+The benchmark database (--db-name, default resume_shortlister_bench) is
+dropped and re-seeded on every run. Its name must end in "_bench" so a real
+database is never dropped by mistake. In-memory mode has no change streams,
+text indexes or pipeline updates, so use a local mongod for representative
+numbers.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.stubs import FakeHTTPServer, SMTPSink  # noqa: E402
+
+BENCH_PASSWORD = "Bench!pass123"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--mongo-uri", default="mongodb://127.0.0.1:27017", help="Local mongod to benchmark against")
+    target.add_argument("--in-memory", action="store_true", help="Use mongomock-motor instead of a mongod")
+    parser.add_argument("--db-name", default="resume_shortlister_bench")
+
+    parser.add_argument("--users", type=int, default=50, help="Seeded users (signup checks every one with bcrypt)")
+    parser.add_argument("--seed-bcrypt-rounds", type=int, default=4,
+                        help="bcrypt cost for seeded users; the benchmark user always uses the app default")
+    parser.add_argument("--jds", type=int, default=200, help="Seeded JDs for the benchmark user")
+    parser.add_argument("--results", type=int, default=10_000, help="Seeded AI results spread over those JDs")
+    parser.add_argument("--links", type=int, default=20, help="Resume links per submitted JD")
+    parser.add_argument("--store-batch", type=int, default=50, help="Results per /ai/store call")
+    parser.add_argument("--upload-files", type=int, default=3, help="Files per /upload/ call")
+    parser.add_argument("--upload-size", type=int, default=100_000, help="Bytes per uploaded file")
+    parser.add_argument("--archive-members", type=int, default=20, help="Resumes per /upload/archive ZIP")
+
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--ai-latency", type=float, default=0.05, help="Seconds the fake AI webhook waits")
+    parser.add_argument("--drive-latency", type=float, default=0.05, help="Seconds the fake Drive API waits")
+    parser.add_argument("--rate-limit", action="store_true", help="Keep per-user rate limiting switched on")
+    parser.add_argument("--only", nargs="*", help="Run only these endpoint names")
+
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+    if args.jds < 1 or args.users < 1:
+        parser.error("--jds and --users must be at least 1")
+    return args
+
+
+# ✅ Point every external dependency at the stand-ins; must run before `main` is imported
+def configure_environment(args, http_stub: FakeHTTPServer, smtp: SMTPSink):
+    os.environ.update({
+        "MONGO_URI": args.mongo_uri,
+        "MONGO_DB_NAME": args.db_name,
+        "JWT_SECRET": os.environ.get("JWT_SECRET", "bench-secret"),
+        "AI_ENDPOINT": f"{http_stub.base_url}/ai/webhook",
+        "GOOGLE_CLIENT_ID": "bench-client",
+        "GOOGLE_CLIENT_SECRET": "bench-secret",
+        "GOOGLE_REFRESH_TOKEN": "bench-refresh",
+        "GOOGLE_DRIVE_FOLDER_ID": "bench-folder",
+        "GOOGLE_TOKEN_URI": f"{http_stub.base_url}/token",
+        "GOOGLE_DRIVE_API_ENDPOINT": f"{http_stub.base_url}/drive/v3/",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp.port),
+        "SMTP_STARTTLS": "false",
+        "SMTP_SENDER_EMAIL": "bench@gmail.com",
+        "SMTP_SENDER_PASSWORD": "bench",
+        "RATE_LIMIT_ENABLED": "true" if args.rate_limit else "false",
+        "MONGO_ANALYTICS_READ_PREFERENCE": "primary",
+    })
+
+
+# ✅ Seed users, JDs and results directly through the driver
+async def seed(args) -> Dict[str, Any]:
+    import bcrypt
+    from bson import ObjectId
+    import db
+    from utils import hash_password
+
+    if not args.db_name.endswith("_bench"):
+        raise SystemExit(f"Refusing to drop '{args.db_name}': benchmark database names must end in '_bench'.")
+    await db.get_client().drop_database(args.db_name)
+    database = db.get_database()
+    if not args.in_memory:
+        # Dropping the database also dropped the indexes the lifespan warm-up created
+        from repositories.jd_repository import jd_repository
+        from repositories.ai_result_repository import ai_result_repository
+        await jd_repository.ensure_indexes()
+        await ai_result_repository.ensure_indexes()
+
+    started = time.perf_counter()
+    bench_user_id = ObjectId()
+    seed_hash = bcrypt.hashpw(b"Seeded!pass1", bcrypt.gensalt(rounds=args.seed_bcrypt_rounds)).decode()
+    users = [{"_id": bench_user_id, "name": "Bench User", "email": "bench.user@gmail.com",
+              "password": hash_password(BENCH_PASSWORD)}]
+    users += [{"name": f"User {i}", "email": f"user{i}@gmail.com", "password": seed_hash}
+              for i in range(args.users - 1)]
+    await database["users"].insert_many(users)
+
+    now = datetime.utcnow()
+    jds = []
+    for i in range(args.jds):
+        links = [f"https://drive.google.com/file/d/{uuid.uuid4().hex}/view" for _ in range(args.links)]
+        jds.append({
+            "_id": ObjectId(),
+            "user_id": bench_user_id,
+            "job_title": f"Backend Engineer {i}",
+            "job_description": "Build and scale Python services on FastAPI and MongoDB. " * 10,
+            "skills": {"python": 30, "fastapi": 20, "mongodb": 20},
+            "resume_drive_links": links,
+            "created_at": now - timedelta(minutes=i),
+            "status": "complete",
+            "status_detail": None,
+            "status_updated_at": now,
+            "result_count": 0,
+            "expected_results": len(links),
+        })
+    if jds:
+        await database["jd_history"].insert_many(jds)
+
+    batch = []
+    for i in range(args.results):
+        jd = jds[i % len(jds)]
+        skills_score, jd_score = random.uniform(0, 70), random.random()
+        batch.append({
+            "jd_id": jd["_id"],
+            "user_id": bench_user_id,
+            "name": f"Candidate {i}",
+            "skills_score": skills_score,
+            "jd_score": jd_score,
+            "description": "Experienced engineer with distributed systems background. " * 3,
+            "overall_score": round(jd_score * 30 + skills_score, 2),
+        })
+        if len(batch) == 5000:
+            await database["ai_results"].insert_many(batch)
+            batch = []
+    if batch:
+        await database["ai_results"].insert_many(batch)
+
+    return {
+        "user_id": str(bench_user_id),
+        "jd_ids": [str(jd["_id"]) for jd in jds],
+        "seconds": round(time.perf_counter() - started, 3),
+        "users": len(users),
+        "jds": len(jds),
+        "results": args.results,
+    }
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+    wall_seconds: float = 0.0
+
+    def record(self, seconds: float, status: int, ok: bool):
+        self.latencies.append(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            # Nearest-rank percentile
+            rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+            return round(ordered[rank] * 1000, 3)
+
+        return {
+            "requests": len(ordered),
+            "errors": self.errors,
+            "status_counts": {str(code): count for code, count in sorted(self.statuses.items())},
+            "throughput_rps": round(len(ordered) / self.wall_seconds, 2) if self.wall_seconds else None,
+            "latency_ms": {
+                "mean": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None,
+                "p50": percentile(50),
+                "p95": percentile(95),
+                "p99": percentile(99),
+                "max": round(ordered[-1] * 1000, 3) if ordered else None,
+            },
+        }
+
+
+RequestFn = Callable[[Any, int], Awaitable[Any]]
+
+
+async def run_endpoint(client, request_fn: RequestFn, total: int, concurrency: int,
+                       expected=(200,)) -> EndpointStats:
+    stats = EndpointStats()
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await request_fn(client, i)
+                status = response.status_code
+            except Exception:
+                status = 599
+            stats.record(time.perf_counter() - start, status, status in expected)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats.wall_seconds = time.perf_counter() - started
+    return stats
+
+
+def build_archive(members: int, member_size: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for n in range(members):
+            # Text compresses like real resumes do, unlike the random bytes sent to /upload/
+            archive.writestr(f"resumes/resume_{n}.txt", ("Senior Python engineer. " * member_size)[:member_size])
+    return buffer.getvalue()
+
+
+# ✅ One scenario per endpoint; reads run before the writes that would change them
+def build_scenarios(args, ctx: Dict[str, Any]) -> List[tuple]:
+    auth = {"Authorization": f"Bearer {ctx['token']}"}
+    jd_ids = ctx["jd_ids"]
+    hot_jd = jd_ids[0]
+    submitted: List[str] = ctx.setdefault("submitted", [])
+    upload_payload = os.urandom(args.upload_size)
+    archive_payload = build_archive(args.archive_members, args.upload_size)
+
+    def jd_body(i):
+        return {
+            "job_title": f"Submitted JD {i}",
+            "job_description": "Design APIs, tune MongoDB queries and own production reliability.",
+            "skills": {"python": 40, "mongodb": 30},
+            "resume_drive_links": [f"https://drive.google.com/file/d/{uuid.uuid4().hex}/view"
+                                   for _ in range(args.links)],
+        }
+
+    async def etag_of(client, url):
+        response = await client.get(url, headers=auth)
+        return response.headers.get("etag", "")
+
+    async def signup(client, i):
+        return await client.post("/auth/signup/init", json={
+            "name": f"Signup {i}", "email": f"signup.{uuid.uuid4().hex[:12]}@gmail.com",
+            "password": f"Pw!{uuid.uuid4().hex[:10]}1",
+        })
+
+    async def login(client, i):
+        return await client.post("/auth/login", json={"email": "bench.user@gmail.com", "password": BENCH_PASSWORD})
+
+    async def me(client, i):
+        return await client.get("/auth/me", headers=auth)
+
+    async def history(client, i):
+        return await client.get("/jd/history", headers=auth)
+
+    async def history_304(client, i):
+        return await client.get("/jd/history", headers={**auth, "If-None-Match": ctx["history_etag"]})
+
+    async def results(client, i):
+        return await client.get(f"/ai/results/{random.choice(jd_ids)}", headers=auth)
+
+    async def results_304(client, i):
+        return await client.get(f"/ai/results/{hot_jd}", headers={**auth, "If-None-Match": ctx["results_etag"]})
+
+    async def search_jds(client, i):
+        return await client.get("/jd/search", headers=auth, params={"q": "backend engineer python", "page": 1})
+
+    async def search_results(client, i):
+        return await client.get("/ai/results/search", headers=auth, params={"q": "distributed systems"})
+
+    async def candidate_count(client, i):
+        return await client.get(f"/ai/candidate-count/{random.choice(jd_ids)}", headers=auth)
+
+    async def store(client, i):
+        jd_id = random.choice(jd_ids)
+        return await client.post("/ai/store", headers=auth, json=[{
+            "jd_id": jd_id, "name": f"Stored {i}-{n}", "skills_score": random.uniform(0, 70),
+            "jd_score": random.random(), "description": "Benchmark candidate",
+        } for n in range(args.store_batch)])
+
+    async def submit(client, i):
+        response = await client.post("/jd/submit", headers=auth, json=jd_body(i))
+        if response.status_code == 200:
+            submitted.append(response.json()["jd_id"])
+        return response
+
+    async def update(client, i):
+        return await client.put(f"/jd/update/{submitted[i % len(submitted)]}", headers=auth, json=jd_body(i))
+
+    async def upload(client, i):
+        files = [("files", (f"resume_{i}_{n}.pdf", upload_payload, "application/pdf"))
+                 for n in range(args.upload_files)]
+        return await client.post("/upload/", headers=auth, files=files)
+
+    async def upload_archive(client, i):
+        # Attaching to a JD also covers the expected_results update and the AI re-dispatch
+        return await client.post("/upload/archive", headers=auth, data={"jd_id": jd_ids[i % len(jd_ids)]},
+                                 files={"archive": ("resumes.zip", archive_payload, "application/zip")})
+
+    async def delete(client, i):
+        return await client.delete(f"/jd/delete/{submitted.pop()}", headers=auth)
+
+    async def prepare_etags(client):
+        ctx["history_etag"] = await etag_of(client, "/jd/history")
+        ctx["results_etag"] = await etag_of(client, f"/ai/results/{hot_jd}")
+
+    return [
+        ("POST /auth/signup/init", signup, (200,), None),
+        ("POST /auth/login", login, (200,), None),
+        ("GET /auth/me", me, (200,), None),
+        ("GET /jd/history", history, (200,), None),
+        ("GET /jd/history (304)", history_304, (304,), prepare_etags),
+        ("GET /ai/results/{jd_id}", results, (200,), None),
+        ("GET /ai/results/{jd_id} (304)", results_304, (304,), prepare_etags),
+        ("GET /ai/candidate-count/{jd_id}", candidate_count, (200,), None),
+        ("GET /jd/search", search_jds, (200,), None),
+        ("GET /ai/results/search", search_results, (200,), None),
+        ("POST /ai/store", store, (200,), None),
+        ("POST /jd/submit", submit, (200,), None),
+        ("PUT /jd/update/{jd_id}", update, (200,), None),
+        ("POST /upload/", upload, (200,), None),
+        ("POST /upload/archive", upload_archive, (200,), None),
+        ("DELETE /jd/delete/{jd_id}", delete, (200,), None),
+    ]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]):
+    print(f"{'endpoint':40} {'metric':6} {'baseline':>10} {'current':>10} {'delta':>8}", file=sys.stderr)
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("p50", "p95", "p99"):
+            before, after = previous["latency_ms"][metric], current["latency_ms"][metric]
+            if before is None or after is None:
+                continue
+            delta = (after - before) / before * 100 if before else 0.0
+            print(f"{name:40} {metric:6} {before:10.2f} {after:10.2f} {delta:+7.1f}%", file=sys.stderr)
+
+
+async def run(args) -> Dict[str, Any]:
+    http_stub = FakeHTTPServer(drive_latency=args.drive_latency, ai_latency=args.ai_latency).start()
+    smtp = SMTPSink().start()
+    configure_environment(args, http_stub, smtp)
+
+    import httpx
+    import db
+    if args.in_memory:
+        from mongomock_motor import AsyncMongoMockClient
+        db.client = AsyncMongoMockClient()
+
+    import main
+    from utils import create_access_token
+
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            seeded = await seed(args)
+            ctx = {"token": create_access_token({"user_id": seeded["user_id"]}), "jd_ids": seeded["jd_ids"]}
+
+            transport = httpx.ASGITransport(app=main.app)
+            endpoints = {}
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                for name, request_fn, expected, prepare in build_scenarios(args, ctx):
+                    if args.only and name not in args.only:
+                        continue
+                    if prepare:
+                        await prepare(client)
+                    total = args.requests
+                    if name.startswith(("PUT /jd/update", "DELETE /jd/delete")):
+                        total = min(total, len(ctx["submitted"]))
+                    print(f"… {name} ({total} requests)", file=sys.stderr)
+                    stats = await run_endpoint(client, request_fn, total, args.concurrency, expected)
+                    endpoints[name] = stats.summary()
+    finally:
+        http_stub_counters = http_stub.counters
+        http_stub.stop()
+        smtp.stop()
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mongo": "mongomock" if args.in_memory else args.mongo_uri,
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "seed": {key: value for key, value in seeded.items() if key != "jd_ids"},
+        "stubs": {**http_stub_counters, "smtp_messages": smtp.messages},
+        "endpoints": endpoints,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(rendered + "\n")
+    else:
+        print(rendered)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            compare(report, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
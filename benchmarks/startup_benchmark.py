@@ -0,0 +1,75 @@
+"""
+Measures cold-start cost of the API: importing `main` and running the lifespan
+startup, each in a fresh interpreter so nothing is cached between runs.
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 10 > startup.json
+
+Dummy settings are used for anything not already in the environment, and
+MONGO_URI points at a closed port, so a result that depends on the network
+shows up as a slow or failing run.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+
+async def start():
+    async with main.app.router.lifespan_context(main.app):
+        t2 = time.perf_counter()
+    return t2
+
+t2 = asyncio.run(start())
+print(json.dumps({"import_s": t1 - t0, "lifespan_startup_s": t2 - t1}))
+"""
+
+DEFAULT_ENV = {
+    "MONGO_URI": "mongodb://127.0.0.1:9/?serverSelectionTimeoutMS=500",
+    "JWT_SECRET": "startup-benchmark",
+}
+
+
+def run_once() -> dict:
+    env = {**DEFAULT_ENV, **os.environ}
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(values):
+    return {
+        "min": min(values),
+        "median": statistics.median(values),
+        "mean": statistics.fmean(values),
+        "max": max(values),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "import_s": summarize([s["import_s"] for s in samples]),
+        "lifespan_startup_s": summarize([s["lifespan_startup_s"] for s in samples]),
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Local stand-ins for the services the API talks to, so benchmarks run offline:
+
+- FakeHTTPServer: Google OAuth token endpoint, Drive v3 uploads/deletes and the
+  AI webhook, each with configurable latency.
+- SMTPSink: accepts and discards mail, advertising AUTH so smtplib.login works.
+
+Every server runs on its own thread, so it never competes with the app's event loop.
+"""
+import json
+import socketserver
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import urlparse, parse_qs
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Set per server instance in FakeHTTPServer.__init__
+    latencies: Dict[str, float] = {}
+    counters: Dict[str, int] = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _count(self, name: str):
+        with self.server.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def _send_json(self, status: int, payload, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_empty(self, status: int, headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def _drive_file(self):
+        file_id = uuid.uuid4().hex
+        return {"id": file_id, "webViewLink": f"https://drive.google.com/file/d/{file_id}/view"}
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self._read_body()
+
+        if url.path.endswith("/token"):
+            self._count("token")
+            return self._send_json(200, {"access_token": "bench-token", "expires_in": 3600, "token_type": "Bearer"})
+
+        if url.path.startswith("/ai"):
+            self._count("ai_webhook")
+            time.sleep(self.latencies.get("ai", 0))
+            return self._send_json(200, {"message": "accepted"})
+
+        if "resumable" in query.get("uploadType", []):
+            # First leg of a resumable upload: hand back a session URL for the PUT
+            session_url = f"http://{self.headers['Host']}/upload/session/{uuid.uuid4().hex}"
+            return self._send_empty(200, {"Location": session_url})
+
+        self._count("drive_upload")
+        time.sleep(self.latencies.get("drive", 0))
+        return self._send_json(200, self._drive_file())
+
+    def do_PUT(self):
+        self._read_body()
+        self._count("drive_upload")
+        time.sleep(self.latencies.get("drive", 0))
+        return self._send_json(200, self._drive_file())
+
+    def do_DELETE(self):
+        self._count("drive_delete")
+        time.sleep(self.latencies.get("drive", 0))
+        return self._send_empty(204)
+
+
+class FakeHTTPServer:
+    """Serves /token, Drive upload/delete paths and /ai/* on one local port."""
+
+    def __init__(self, drive_latency: float = 0.0, ai_latency: float = 0.0):
+        handler = type("StubHandler", (_StubHandler,), {
+            "latencies": {"drive": drive_latency, "ai": ai_latency},
+            "counters": {},
+        })
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.handler = handler
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self.handler.counters)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        self._reply("220 bench-smtp ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode("latin-1").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-bench-smtp")
+                self._reply("250 AUTH PLAIN LOGIN")
+            elif verb == "AUTH":
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        # Client went away mid-message
+                        return
+                    if line.rstrip(b"\r\n") == b".":
+                        break
+                with self.server.lock:
+                    self.server.messages += 1
+                self._reply("250 OK: queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class SMTPSink:
+    """Minimal SMTP server that accepts and counts messages. No STARTTLS."""
+
+    def __init__(self):
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.messages = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    @property
+    def messages(self) -> int:
+        return self.server.messages
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
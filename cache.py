@@ -0,0 +1,189 @@
+import os
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pymongo import ReturnDocument
+
+from db import db
+from repositories.base_repository import primary_reads
+
+# ✅ Load environment variables
+load_dotenv()
+
+# "memory" keeps version counters inside this process (single worker only).
+# "mongo" keeps them in a shared collection so every worker sees every write.
+CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# Total size of cached bodies; large /ai/results payloads are what actually fill memory
+CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Scopes whose in-memory version counter is kept; the least recently bumped are forgotten first
+CACHE_MAX_VERSIONS = int(os.getenv("RESPONSE_CACHE_MAX_VERSIONS", "100000"))
+
+
+# ✅ Version scopes bumped by writes and read by cached endpoints
+def jd_history_scope(user_id: str) -> str:
+    return f"history:{user_id}"
+
+
+def ai_results_scope(user_id: str, jd_id: str) -> str:
+    return f"results:{user_id}:{jd_id}"
+
+
+class InMemoryVersionStore:
+    """Per-process version counters, capped at `max_scopes`. Not shared between workers."""
+
+    def __init__(self, max_scopes: int):
+        self.max_scopes = max_scopes
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        # Versions come from one process-wide clock so a value is never reused by any scope
+        self._clock = 0
+        # Highest version forgotten so far; unknown scopes report it, so nothing cached
+        # under a forgotten scope's older versions can match again
+        self._floor = 0
+
+    async def get(self, scope: str) -> int:
+        return self._versions.get(scope, self._floor)
+
+    async def bump(self, scope: str) -> int:
+        self._clock += 1
+        self._versions[scope] = self._clock
+        self._versions.move_to_end(scope)
+        while len(self._versions) > self.max_scopes:
+            _, forgotten = self._versions.popitem(last=False)
+            self._floor = max(self._floor, forgotten)
+        return self._clock
+
+
+class MongoVersionStore:
+    """Version counters shared by all workers through a small Mongo collection."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    async def get(self, scope: str) -> int:
+        doc = await self._collection.find_one({"_id": scope}, {"version": 1})
+        return doc["version"] if doc else 0
+
+    async def bump(self, scope: str) -> int:
+        doc = await self._collection.find_one_and_update(
+            {"_id": scope},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["version"]
+
+
+@dataclass
+class CachedBody:
+    version: int
+    etag: str
+    body: bytes
+
+
+class ResponseCache:
+    """LRU of rendered JSON bodies keyed by (scope, endpoint), bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[Tuple[str, str], CachedBody]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str], version: int) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple[str, str], entry: CachedBody):
+        self._discard(key)
+        # A body bigger than the whole budget would only evict everything else
+        if len(entry.body) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.size_bytes += len(entry.body)
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted.body)
+
+    def _discard(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry.body)
+
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
+
+
+if CACHE_BACKEND == "mongo":
+    versions = MongoVersionStore(db["cache_versions"])
+elif CACHE_BACKEND == "memory":
+    versions = InMemoryVersionStore(CACHE_MAX_VERSIONS)
+else:
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND '{CACHE_BACKEND}'. Use 'memory' or 'mongo'.")
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+
+# Strong ETag derived from the body itself, so it stays valid across restarts and workers
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+# ✅ Invalidate every cached response under the given scopes
+async def invalidate(*scopes: str):
+    for scope in scopes:
+        await versions.bump(scope)
+
+
+# ✅ Serve a JSON payload through the version-checked cache with ETag/304 support
+async def cached_json_response(
+    request: Request,
+    scope: str,
+    endpoint: str,
+    loader: Callable[[], Awaitable[Dict[str, Any]]],
+) -> Response:
+    # Read the version *before* loading so a concurrent write can only make
+    # the stored entry look older than it is, never newer.
+    version = await versions.get(scope)
+    key = (scope, endpoint)
+
+    entry = response_cache.get(key, version)
+    if entry is None:
+        # Misses load from the primary: the entry stays valid until the next bump,
+        # so it must already include the write that produced this version
+        with primary_reads():
+            payload = await loader()
+        body = JSONResponse(content=jsonable_encoder(payload)).body
+        entry = CachedBody(version=version, etag=make_etag(body), body=body)
+        response_cache.put(key, entry)
+
+    if _etag_matches(request, entry.etag):
+        return _not_modified(entry.etag)
+
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={"ETag": entry.etag, "Cache-Control": "private, no-cache"},
+    )
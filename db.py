@@ -1,5 +1,10 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference
 from dotenv import load_dotenv
+from typing import List, Optional
+import importlib.util
+from metrics import mongo_command_metrics
+import asyncio
 import os
 
 # ✅ Load environment variables from .env file
@@ -7,19 +12,101 @@ load_dotenv()
 
 # ✅ Get Mongo URI from .env
 MONGO_URI = os.getenv("MONGO_URI")
+DB_NAME = os.getenv("MONGO_DB_NAME", "resume_shortlister")
 
-# ✅ Raise error if MONGO_URI is missing
-if not MONGO_URI:
-    raise ValueError("❌ MONGO_URI not found in .env file. Please set it in your .env.")
+# ✅ Connection pool and wire compression, tunable per deployment
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
 
-# ✅ Connect to MongoDB
-client = AsyncIOMotorClient(MONGO_URI)
+# ✅ Read preference for queries that tolerate slight replica lag. Only the JD/result search
+# queries use it: history, results and candidate-count are served from the response cache,
+# and cache misses always read the primary so a stale body is never cached.
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+ANALYTICS_READ_PREFERENCE_NAME = os.getenv("MONGO_ANALYTICS_READ_PREFERENCE", "secondaryPreferred")
+if ANALYTICS_READ_PREFERENCE_NAME not in READ_PREFERENCES:
+    raise ValueError(
+        f"Unknown MONGO_ANALYTICS_READ_PREFERENCE '{ANALYTICS_READ_PREFERENCE_NAME}'. "
+        f"Use one of: {', '.join(READ_PREFERENCES)}."
+    )
+ANALYTICS_READ_PREFERENCE = READ_PREFERENCES[ANALYTICS_READ_PREFERENCE_NAME]
 
-# ✅ Use the database and relevant collections
-db = client["resume_shortlister"]
+# Python packages pymongo needs for each wire compressor (zlib is in the stdlib)
+COMPRESSOR_PACKAGES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
 
-users_collection = db["users"]
-jd_collection = db["jd_history"]
-otp_collection = db["otp_temp"]
-ai_results_collection = db["ai_results"]
 
+def available_compressors() -> List[str]:
+    # Only advertise compressors whose libraries are installed, otherwise pymongo warns on every connect
+    requested = [name.strip() for name in MONGO_COMPRESSORS.split(",") if name.strip()]
+    return [
+        name for name in requested
+        if name in COMPRESSOR_PACKAGES and importlib.util.find_spec(COMPRESSOR_PACKAGES[name]) is not None
+    ]
+
+
+# ✅ The client is created lazily (normally from the app lifespan), never at import time
+client: Optional[AsyncIOMotorClient] = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    global client
+    if client is None:
+        # ✅ Raise error if MONGO_URI is missing
+        if not MONGO_URI:
+            raise ValueError("❌ MONGO_URI not found in .env file. Please set it in your .env.")
+        options = {
+            "maxPoolSize": MONGO_MAX_POOL_SIZE,
+            "minPoolSize": MONGO_MIN_POOL_SIZE,
+            "event_listeners": [mongo_command_metrics],
+        }
+        compressors = available_compressors()
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        # Constructing the client does no network I/O; connections open on first use
+        client = AsyncIOMotorClient(MONGO_URI, **options)
+    return client
+
+
+def get_database():
+    return get_client()[DB_NAME]
+
+
+class LazyCollection:
+    """Stands in for a Motor collection and resolves it on first attribute access."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_database()[self.name], attr)
+
+
+class LazyDatabase:
+    def __getitem__(self, name: str) -> LazyCollection:
+        return LazyCollection(name)
+
+
+# ✅ Use the database; per-collection access lives in the repositories package
+db = LazyDatabase()
+
+
+def connect_db() -> AsyncIOMotorClient:
+    return get_client()
+
+
+def close_db():
+    global client
+    if client is not None:
+        client.close()
+        client = None
+
+
+# ✅ Round-trip to the server; used for warm-up and readiness checks
+async def ping_db(timeout: float = 2.0):
+    await asyncio.wait_for(get_client().admin.command("ping"), timeout=timeout)
@@ -0,0 +1,185 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from repositories.jd_repository import jd_repository
+from models.jd_model import JDStatus
+
+# ✅ Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "memory" publishes state changes to subscribers in this process only (single node).
+# "changestream" tails Mongo change streams so every node sees every write (needs a replica set).
+JD_EVENTS_BACKEND = os.getenv("JD_EVENTS_BACKEND", "memory").lower()
+if JD_EVENTS_BACKEND not in ("memory", "changestream"):
+    raise ValueError(f"Unknown JD_EVENTS_BACKEND '{JD_EVENTS_BACKEND}'. Use 'memory' or 'changestream'.")
+
+SUBSCRIBER_QUEUE_SIZE = 32
+
+_EVENT_FIELDS = ("status", "status_detail", "result_count", "expected_results", "status_updated_at")
+
+
+# ✅ Shape a JD document into the payload pushed to SSE clients
+def jd_progress_event(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "jd_id": str(doc["_id"]),
+        # JDs created before the state machine existed were scored long ago
+        "status": doc.get("status", JDStatus.COMPLETE.value),
+        "status_detail": doc.get("status_detail"),
+        "result_count": doc.get("result_count", 0),
+        "expected_results": doc.get("expected_results", len(doc.get("resume_drive_links", []))),
+        "updated_at": doc.get("status_updated_at"),
+    }
+
+
+class JDEventBroker:
+    """In-process fan-out of JD progress events to SSE subscribers."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, jd_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(jd_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, jd_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(jd_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[jd_id]
+
+    def has_subscribers(self, jd_id: str) -> bool:
+        return jd_id in self._subscribers
+
+    def publish(self, jd_id: str, event: Dict[str, Any]):
+        for queue in self._subscribers.get(jd_id, ()):
+            # Events are full snapshots, so a slow client only needs the latest one
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+broker = JDEventBroker()
+
+
+def _publish_local(doc: Optional[Dict[str, Any]]):
+    # With change streams the watcher publishes, so writers stay silent to avoid duplicates
+    if doc is not None and JD_EVENTS_BACKEND == "memory":
+        broker.publish(str(doc["_id"]), jd_progress_event(doc))
+
+
+# ✅ Move a JD to a new processing state and notify subscribers
+async def set_jd_status(
+    jd_id: str,
+    status: JDStatus,
+    detail: Optional[str] = None,
+    from_status: Optional[JDStatus] = None,
+    **fields: Any,
+):
+    # from_status makes the move conditional, so a late writer can't undo progress
+    # that record_results already made (e.g. results stored before the webhook replied)
+    update = {
+        "status": status.value,
+        "status_detail": detail,
+        "status_updated_at": datetime.utcnow(),
+        **fields,
+    }
+    doc = await jd_repository.set_fields(jd_id, update, from_status.value if from_status else None)
+    _publish_local(doc)
+    return doc
+
+
+# ✅ Append resume links to a JD and re-queue it until they are scored
+async def attach_resume_links(jd_id: str, user_id: str, links: List[str]) -> Optional[Dict[str, Any]]:
+    doc = await jd_repository.add_resume_links(jd_id, user_id, links, {
+        "status": JDStatus.QUEUED.value,
+        "status_detail": None,
+        "status_updated_at": datetime.utcnow(),
+    })
+    _publish_local(doc)
+    return doc
+
+
+# ✅ Count newly stored AI results against a JD and advance it to scoring/complete
+async def record_results(jd_id: str, user_id: str, count: int):
+    # Single atomic pipeline update so concurrent /ai/store batches can't race each other.
+    # Scoped to the caller's JDs: results stored against someone else's JD must not move it.
+    reached_expected = {"$and": [
+        {"$gt": ["$expected_results", 0]},
+        {"$gte": ["$result_count", "$expected_results"]},
+    ]}
+    doc = await jd_repository.apply_pipeline_for_user(
+        jd_id,
+        user_id,
+        [
+            {"$set": {"result_count": {"$add": [{"$ifNull": ["$result_count", 0]}, count]}}},
+            {"$set": {
+                "status": {"$cond": [
+                    {"$or": [reached_expected, {"$eq": ["$status", JDStatus.COMPLETE.value]}]},
+                    JDStatus.COMPLETE.value,
+                    JDStatus.SCORING.value,
+                ]},
+                "status_detail": None,
+                "status_updated_at": "$$NOW",
+            }},
+        ],
+    )
+    _publish_local(doc)
+    return doc
+
+
+# --- Change stream fan-out (multi-node) ---
+
+_watcher_task: Optional[asyncio.Task] = None
+
+
+async def _watch_jd_changes():
+    pipeline = [
+        {"$match": {"operationType": {"$in": ["update", "replace"]}}},
+        {"$project": {"documentKey": 1, **{f"fullDocument.{field}": 1 for field in _EVENT_FIELDS}}},
+    ]
+    resume_token = None
+    while True:
+        try:
+            async with jd_repository.watch(
+                pipeline, full_document="updateLookup", resume_after=resume_token
+            ) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    jd_id = str(change["documentKey"]["_id"])
+                    if change.get("fullDocument") and broker.has_subscribers(jd_id):
+                        broker.publish(jd_id, jd_progress_event({"_id": jd_id, **change["fullDocument"]}))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"JD change stream interrupted, retrying: {e}")
+            await asyncio.sleep(1)
+
+
+def ensure_change_stream_watcher():
+    global _watcher_task
+    if JD_EVENTS_BACKEND != "changestream":
+        return
+    if _watcher_task is None or _watcher_task.done():
+        _watcher_task = asyncio.create_task(_watch_jd_changes())
+
+
+async def stop_change_stream_watcher():
+    global _watcher_task
+    if _watcher_task is None:
+        return
+    _watcher_task.cancel()
+    try:
+        await _watcher_task
+    except asyncio.CancelledError:
+        pass
+    _watcher_task = None
@@ -1,4 +1,7 @@
 # main.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -7,11 +10,58 @@ from routes.auth_routes import router as auth_router
 from routes.jd_routes import router as jd_router
 from routes.ai_routes import router as ai_router
 from routes.upload_to_drive import router as drive_upload_router # Your original main.py for drive upload
+from routes.health_routes import router as health_router
+from routes.metrics_routes import router as metrics_router
+from routes.admin_routes import router as admin_router
+from routes.jd_routes import get_ai_client, close_ai_client
+from routes.upload_to_drive import warm_drive
+from rate_limit import RateLimitMiddleware
+from jd_events import ensure_change_stream_watcher, stop_change_stream_watcher
+from db import connect_db, close_db, ping_db
+from repositories.jd_repository import jd_repository
+from repositories.ai_result_repository import ai_result_repository
+from metrics import MetricsMiddleware, monitor_event_loop
+from profiling import ProfilingMiddleware, profiling_enabled
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up():
+    # Runs after startup has completed, so network latency never delays serving
+    try:
+        await ping_db()
+    except Exception as e:
+        logger.warning(f"MongoDB warm-up ping failed: {e}")
+    for repository in (jd_repository, ai_result_repository):
+        try:
+            await repository.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Could not ensure indexes on '{repository.collection_name}': {e}")
+    await asyncio.to_thread(warm_drive)
+
+
+# ✅ Create external clients on startup (no network I/O) and warm them in the background
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connect_db()
+    get_ai_client()
+    ensure_change_stream_watcher()
+    warm_up_task = asyncio.create_task(warm_up())
+    loop_monitor_task = asyncio.create_task(monitor_event_loop())
+    yield
+    warm_up_task.cancel()
+    loop_monitor_task.cancel()
+    # Stopped before close_db, otherwise its retry loop would lazily open a new client
+    await stop_change_stream_watcher()
+    await close_ai_client()
+    close_db()
+
 
 app = FastAPI(
     title="Resume Shortlister API",
     description="Backend API for login, JD submission, and scoring",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 origins = [
@@ -20,6 +70,13 @@ origins = [
     # Add your frontend deployment URL here
 ]
 
+# Only installed when switched on, so disabled profiling costs nothing per request
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+
+# Added before CORS so throttled (429) responses still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -28,10 +85,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency includes every other middleware and throttled requests are counted
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(jd_router)
 app.include_router(ai_router)
 app.include_router(drive_upload_router) # This router for direct file uploads to Drive
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
 
 @app.get("/")
 def root():
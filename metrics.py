@@ -0,0 +1,194 @@
+import os
+import time
+import asyncio
+import functools
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import Gauge, Histogram
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR_INTERVAL_SECONDS = float(os.getenv("METRICS_LOOP_MONITOR_INTERVAL", "0.5"))
+
+# ✅ Metric definitions
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by collection and command",
+    ["collection", "command", "outcome"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EXTERNAL_CALL_LATENCY = Histogram(
+    "external_call_duration_seconds",
+    "Latency of outbound calls (SMTP, Google Drive, AI webhook)",
+    ["operation", "outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a sleeping task during the last sample",
+)
+THREAD_POOL_QUEUE_DEPTH = Gauge(
+    "thread_pool_queue_depth",
+    "Work items waiting for a worker thread",
+    ["pool"],
+)
+
+
+# ✅ Route latency middleware
+class MetricsMiddleware:
+    """Records per-route latency using the matched route template, not the raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"]),
+            ).observe(time.perf_counter() - start)
+
+
+# ✅ Motor/pymongo command monitoring
+# Set to a list by the profiling middleware to collect the commands a single request issues
+mongo_command_log: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("mongo_command_log", default=None)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command the driver sends, labelled by collection and command name."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, object], Tuple[str, str]] = {}
+
+    @staticmethod
+    def _collection(event: monitoring.CommandStartedEvent) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore carries a cursor id; its collection is a separate field
+        return event.command.get("collection", "-")
+
+    def started(self, event):
+        self._pending[(event.request_id, event.connection_id)] = (self._collection(event), event.command_name)
+
+    def _finish(self, event, outcome: str):
+        labels = self._pending.pop((event.request_id, event.connection_id), None)
+        if labels is None:
+            return
+        collection, command = labels
+        MONGO_COMMAND_LATENCY.labels(collection=collection, command=command, outcome=outcome).observe(
+            event.duration_micros / 1_000_000
+        )
+
+        command_log = mongo_command_log.get()
+        if command_log is not None:
+            command_log.append({
+                "collection": collection,
+                "command": command,
+                "outcome": outcome,
+                "duration_ms": event.duration_micros / 1000,
+            })
+
+    def succeeded(self, event):
+        self._finish(event, "success")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+# ✅ Timer for outbound calls; works on both sync and async functions
+def track_external(operation: str):
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await func(*args, **kwargs)
+                    outcome = "success"
+                    return result
+                finally:
+                    EXTERNAL_CALL_LATENCY.labels(operation=operation, outcome=outcome).observe(
+                        time.perf_counter() - start
+                    )
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = func(*args, **kwargs)
+                outcome = "success"
+                return result
+            finally:
+                EXTERNAL_CALL_LATENCY.labels(operation=operation, outcome=outcome).observe(
+                    time.perf_counter() - start
+                )
+        return sync_wrapper
+    return decorator
+
+
+# ✅ Event-loop lag and thread-pool backlog sampler
+def _executor_queue_depth(executor) -> Optional[int]:
+    # ThreadPoolExecutor keeps pending work in a private queue; absent on other executor types
+    work_queue = getattr(executor, "_work_queue", None)
+    return work_queue.qsize() if work_queue is not None else None
+
+
+def _sample_thread_pools(loop: asyncio.AbstractEventLoop):
+    depth = _executor_queue_depth(getattr(loop, "_default_executor", None))
+    if depth is not None:
+        THREAD_POOL_QUEUE_DEPTH.labels(pool="asyncio_default").set(depth)
+
+    try:
+        from motor.frameworks import asyncio as motor_asyncio
+        depth = _executor_queue_depth(getattr(motor_asyncio, "_EXECUTOR", None))
+        if depth is not None:
+            THREAD_POOL_QUEUE_DEPTH.labels(pool="motor").set(depth)
+    except ImportError:
+        pass
+
+    try:
+        import anyio.to_thread
+        # Starlette runs sync endpoints and UploadFile I/O through anyio's limiter
+        stats = anyio.to_thread.current_default_thread_limiter().statistics()
+        THREAD_POOL_QUEUE_DEPTH.labels(pool="anyio").set(stats.tasks_waiting)
+    except Exception:
+        pass
+
+
+async def monitor_event_loop():
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LOOP_MONITOR_INTERVAL_SECONDS
+        await asyncio.sleep(LOOP_MONITOR_INTERVAL_SECONDS)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - expected))
+        _sample_thread_pools(loop)
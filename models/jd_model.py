@@ -1,8 +1,19 @@
 from pydantic import BaseModel  ,HttpUrl
 from typing import Dict, Optional ,List 
+from enum import Enum
 
 class JDInput(BaseModel):
     job_title: str
     job_description: str
     skills: Dict[str, int]
     resume_drive_links: Optional[List[HttpUrl]] = None
+
+# Processing lifecycle persisted on each JD: queued -> dispatched -> scoring -> complete/failed
+class JDStatus(str, Enum):
+    QUEUED = "queued"
+    DISPATCHED = "dispatched"
+    SCORING = "scoring"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+TERMINAL_JD_STATUSES = {JDStatus.COMPLETE, JDStatus.FAILED}
@@ -0,0 +1,177 @@
+import os
+import re
+import hmac
+import heapq
+import random
+import time
+import uuid
+import logging
+import itertools
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from metrics import mongo_command_log
+
+# ✅ Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Fraction of requests profiled at random (0 disables sampling)
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+# Shared secret for the X-Profile-Request trigger header and the /admin/profiles endpoints
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN")
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "20"))
+PROFILING_INTERVAL_SECONDS = float(os.getenv("PROFILING_INTERVAL_SECONDS", "0.001"))
+# Cap on simultaneously profiled requests so a sampling burst can't slow everything down
+PROFILING_MAX_CONCURRENT = int(os.getenv("PROFILING_MAX_CONCURRENT", "2"))
+
+PROFILE_TRIGGER_HEADER = b"x-profile-request"
+
+# Long-lived SSE streams would hold a profiling slot for their whole life and always rank slowest
+UNPROFILED_PATHS = [re.compile(r"^/jd/[^/]+/events/?$")]
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pyinstrument is only needed when profiling is switched on
+    Profiler = None
+
+
+def profiling_enabled() -> bool:
+    configured = PROFILING_SAMPLE_RATE > 0 or bool(PROFILING_ADMIN_TOKEN)
+    if configured and Profiler is None:
+        logger.warning("Request profiling is configured but pyinstrument is not installed; profiling is disabled.")
+        return False
+    return configured
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    if not (PROFILING_ADMIN_TOKEN and token):
+        return False
+    # compare_digest rejects non-ASCII str, so compare the raw header bytes (headers decode as latin-1)
+    try:
+        supplied = token.encode("latin-1")
+    except UnicodeEncodeError:
+        return False
+    return hmac.compare_digest(supplied, PROFILING_ADMIN_TOKEN.encode("utf-8"))
+
+
+# ✅ Flamegraph-ready collapsed stacks ("outer;inner;leaf <weight>") from a pyinstrument session
+def _frame_label(frame) -> str:
+    label = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+    return label.replace(";", ":")
+
+
+def collapsed_stacks(session) -> List[str]:
+    root = session.root_frame() if session else None
+    if root is None:
+        return []
+
+    lines = []
+    stack = [(root, [])]
+    while stack:
+        frame, parents = stack.pop()
+        path = parents + [_frame_label(frame)]
+        self_time = frame.time - sum(child.time for child in frame.children)
+        # Weights are whole microseconds, as flamegraph tools expect integers
+        weight = int(round(self_time * 1_000_000))
+        if weight > 0:
+            lines.append(f"{';'.join(path)} {weight}")
+        stack.extend((child, path) for child in frame.children)
+    return lines
+
+
+class SlowestProfiles:
+    """Keeps only the N slowest profiles seen, evicting the fastest when full."""
+
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+
+    def add(self, profile: Dict[str, Any]):
+        item = (profile["duration_ms"], next(self._counter), profile)
+        if len(self._heap) < self.max_profiles:
+            heapq.heappush(self._heap, item)
+        elif item[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [profile for _, _, profile in sorted(self._heap, key=lambda item: item[0], reverse=True)]
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        for _, _, profile in self._heap:
+            if profile["id"] == profile_id:
+                return profile
+        return None
+
+    def clear(self):
+        self._heap.clear()
+
+
+profile_store = SlowestProfiles(PROFILING_MAX_PROFILES)
+
+
+class ProfilingMiddleware:
+    """Profiles sampled or explicitly requested calls with pyinstrument and keeps the slowest."""
+
+    def __init__(self, app):
+        self.app = app
+        self._active = 0
+
+    def _should_profile(self, scope) -> bool:
+        if self._active >= PROFILING_MAX_CONCURRENT:
+            return False
+        if any(pattern.match(scope["path"]) for pattern in UNPROFILED_PATHS):
+            return False
+        for key, value in scope["headers"]:
+            if key == PROFILE_TRIGGER_HEADER:
+                return is_admin_token(value.decode("latin-1"))
+        return PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        commands: List[Dict[str, Any]] = []
+        log_token = mongo_command_log.set(commands)
+        profiler = Profiler(interval=PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+        self._active += 1
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            duration = time.perf_counter() - start
+            self._active -= 1
+            mongo_command_log.reset(log_token)
+
+            route = scope.get("route")
+            try:
+                stacks = collapsed_stacks(session)
+            except Exception as e:
+                logger.warning(f"Could not render profile for {scope['path']}: {e}")
+                stacks = []
+            profile_store.add({
+                "id": uuid.uuid4().hex,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status["code"],
+                "started_at": started_at.isoformat() + "Z",
+                "duration_ms": round(duration * 1000, 3),
+                "mongo_commands": commands,
+                "mongo_time_ms": round(sum(c["duration_ms"] for c in commands), 3),
+                "collapsed_stacks": stacks,
+            })
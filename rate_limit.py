@@ -0,0 +1,311 @@
+import os
+import re
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from db import db
+from utils import decode_access_token
+
+# ✅ Load environment variables
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# "memory" keeps buckets per worker; "mongo" shares them across workers through the rate_limits collection
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+
+
+
+@dataclass(frozen=True)
+class BucketConfig:
+    capacity: float
+    refill_per_second: float
+
+
+# ✅ One bucket per (user, endpoint group); sizes are tunable from the environment
+BUCKETS: Dict[str, BucketConfig] = {
+    "jd": BucketConfig(
+        capacity=float(os.getenv("RATE_LIMIT_JD_CAPACITY", "300")),
+        refill_per_second=float(os.getenv("RATE_LIMIT_JD_REFILL_PER_SEC", "2")),
+    ),
+    "upload": BucketConfig(
+        capacity=float(os.getenv("RATE_LIMIT_UPLOAD_CAPACITY", "200")),
+        refill_per_second=float(os.getenv("RATE_LIMIT_UPLOAD_REFILL_PER_SEC", "1")),
+    ),
+}
+
+
+class InMemoryTokenBuckets:
+    """Token buckets held in this process."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def consume(self, key: str, config: BucketConfig, cost: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (config.capacity, now))
+        tokens = min(config.capacity, tokens + (now - updated_at) * config.refill_per_second)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        return allowed, tokens
+
+
+class MongoTokenBuckets:
+    """Token buckets shared by all workers, refilled and consumed atomically on the server."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    async def consume(self, key: str, config: BucketConfig, cost: float) -> Tuple[bool, float]:
+        # $$NOW keeps every worker on the database clock
+        elapsed_seconds = {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}, 1000]}
+        doc = await self._collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": {"$min": [
+                    config.capacity,
+                    {"$add": [
+                        {"$ifNull": ["$tokens", config.capacity]},
+                        {"$multiply": [elapsed_seconds, config.refill_per_second]},
+                    ]},
+                ]}}},
+                {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                    "updated_at": "$$NOW",
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["allowed"], doc["tokens"]
+
+
+if RATE_LIMIT_BACKEND == "mongo":
+    token_buckets = MongoTokenBuckets(db["rate_limits"])
+elif RATE_LIMIT_BACKEND == "memory":
+    token_buckets = InMemoryTokenBuckets()
+else:
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{RATE_LIMIT_BACKEND}'. Use 'memory' or 'mongo'.")
+
+
+# ✅ Cost weights by endpoint
+def jd_cost(headers: Dict[str, str], body: bytes) -> float:
+    # One token for the JD plus one per resume link the AI webhook will fetch
+    # Malformed bodies are charged the base cost; the route itself answers them with a 422
+    try:
+        links = json.loads(body).get("resume_drive_links")
+    except (ValueError, AttributeError):
+        links = None
+    return 1 + (len(links) if isinstance(links, list) else 0)
+
+
+def upload_cost(headers: Dict[str, str], body: bytes) -> float:
+    # One token for the request; /upload/ files are charged by MultipartPartMeter as they stream in,
+    # and /upload/archive charges its eligible members itself once it has read the central directory
+    return 1
+
+
+def _multipart_boundary(content_type: str) -> Optional[str]:
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.strip().lower() == "boundary" and value:
+            return value.strip().strip('"')
+    return None
+
+
+class MultipartPartMeter:
+    """Counts multipart parts in a streaming body without buffering it; one token per part."""
+
+    def __init__(self, headers: Dict[str, str]):
+        boundary = _multipart_boundary(headers.get("content-type", ""))
+        self.delimiter = b"--" + boundary.encode("latin-1") if boundary else None
+        self._tail = b""
+        self._delimiters_seen = 0
+
+    def feed(self, chunk: bytes) -> float:
+        if not self.delimiter or not chunk:
+            return 0
+        data = self._tail + chunk
+        # Keep just enough bytes to catch a delimiter split across two chunks
+        self._tail = data[-(len(self.delimiter) - 1):]
+        seen = self._delimiters_seen + data.count(self.delimiter)
+        # The first delimiter opens the first part; every later one closes a part
+        charged = max(0, seen - 1) - max(0, self._delimiters_seen - 1)
+        self._delimiters_seen = seen
+        return charged
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    method: str
+    path: "re.Pattern[str]"
+    bucket: str
+    cost: Callable[[Dict[str, str], bytes], float]
+    needs_body: bool = False
+    # Charges more tokens while the body streams in, for costs only known from the body itself
+    meter: Optional[Callable[[Dict[str, str]], MultipartPartMeter]] = None
+
+
+RULES = [
+    RateLimitRule("POST", re.compile(r"^/jd/submit/?$"), "jd", jd_cost, needs_body=True),
+    RateLimitRule("PUT", re.compile(r"^/jd/update/[^/]+/?$"), "jd", jd_cost, needs_body=True),
+    RateLimitRule("POST", re.compile(r"^/upload/?$"), "upload", upload_cost, meter=MultipartPartMeter),
+    RateLimitRule("POST", re.compile(r"^/upload/archive/?$"), "upload", upload_cost),
+]
+
+
+def _match_rule(method: str, path: str) -> Optional[RateLimitRule]:
+    for rule in RULES:
+        if rule.method == method and rule.path.match(path):
+            return rule
+    return None
+
+
+def _user_id_from_headers(headers: Dict[str, str]) -> Optional[str]:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_access_token(token).get("user_id")
+    except HTTPException:
+        # Let the route itself reject the token with its usual 401
+        return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _replay(body: bytes, receive):
+    sent = False
+
+    async def replay_receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay_receive
+
+
+class RateLimitExceeded(Exception):
+    """Raised from a metered receive() to stop the app reading a body that ran out of tokens."""
+
+
+def _retry_after(config: BucketConfig, cost: float, tokens: float) -> int:
+    retry_after = math.ceil((cost - tokens) / config.refill_per_second) if config.refill_per_second > 0 else 60
+    return max(1, retry_after)
+
+
+# ✅ Charge a user's bucket from inside a route, for costs only known once the body is parsed
+async def charge_user(user_id: str, bucket: str, cost: float):
+    if not RATE_LIMIT_ENABLED or cost <= 0:
+        return
+    config = BUCKETS[bucket]
+    cost = min(cost, config.capacity)
+    allowed, tokens = await token_buckets.consume(f"{user_id}:{bucket}", config, cost)
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Please retry later.",
+            headers={"Retry-After": str(_retry_after(config, cost, tokens))},
+        )
+
+
+async def _send_429(send, retry_after: int):
+    body = json.dumps({"detail": "Rate limit exceeded. Please retry later."}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """Per-user token-bucket limiting for JD submission/update and Drive uploads."""
+
+    def __init__(self, app, buckets=None):
+        self.app = app
+        self.buckets = buckets or token_buckets
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+
+        rule = _match_rule(scope["method"], scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        user_id = _user_id_from_headers(headers)
+        if not user_id:
+            return await self.app(scope, receive, send)
+
+        body = b""
+        if rule.needs_body:
+            body = await _read_body(receive)
+            receive = _replay(body, receive)
+
+        config = BUCKETS[rule.bucket]
+        key = f"{user_id}:{rule.bucket}"
+        # A request bigger than the whole bucket is charged the full bucket rather than refused forever
+        cost = min(rule.cost(headers, body), config.capacity)
+        allowed, tokens = await self.buckets.consume(key, config, cost)
+
+        if not allowed:
+            return await _send_429(send, _retry_after(config, cost, tokens))
+
+        if rule.meter is None:
+            return await self.app(scope, receive, send)
+        return await self._call_metered(scope, receive, send, rule.meter(headers), key, config)
+
+    async def _call_metered(self, scope, receive, send, meter, key: str, config: BucketConfig):
+        state = {"retry_after": None, "responded": False}
+
+        async def metered_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                cost = min(meter.feed(message.get("body", b"")), config.capacity)
+                if cost > 0:
+                    allowed, tokens = await self.buckets.consume(key, config, cost)
+                    if not allowed:
+                        state["retry_after"] = _retry_after(config, cost, tokens)
+                        raise RateLimitExceeded()
+            return message
+
+        async def metered_send(message):
+            if state["retry_after"] is None:
+                return await send(message)
+            # The app answers the aborted body read with its own error; send the 429 in its place
+            if message["type"] == "http.response.start" and not state["responded"]:
+                state["responded"] = True
+                await _send_429(send, state["retry_after"])
+
+        try:
+            await self.app(scope, metered_receive, metered_send)
+        except RateLimitExceeded:
+            if not state["responded"]:
+                state["responded"] = True
+                await _send_429(send, state["retry_after"])
@@ -0,0 +1,46 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, TEXT
+from repositories.base_repository import BaseRepository
+
+
+class AIResultRepository(BaseRepository):
+    collection_name = "ai_results"
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            [("user_id", ASCENDING), ("name", TEXT), ("description", TEXT)],
+            weights={"name": 5, "description": 1},
+            name="result_text_search",
+        )
+
+    async def insert_many(self, docs: List[Dict[str, Any]]):
+        await self.collection.insert_many(docs)
+
+    async def iter_for_jd(self, jd_id: str, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        cursor = self.analytics.find({
+            "jd_id": ObjectId(jd_id),
+            "user_id": ObjectId(user_id)
+        })
+        async for doc in cursor:
+            yield doc
+
+    async def count_for_jd(self, jd_id: str, user_id: str) -> int:
+        return await self.analytics.count_documents({
+            "jd_id": ObjectId(jd_id),
+            "user_id": ObjectId(user_id)
+        })
+
+    async def search_for_user(
+        self, user_id: str, query: str, skip: int, limit: int, jd_id: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        query_filter: Dict[str, Any] = {"user_id": ObjectId(user_id), "$text": {"$search": query}}
+        if jd_id:
+            query_filter["jd_id"] = ObjectId(jd_id)
+        return await self.text_search(query_filter, skip, limit)
+
+    async def delete_for_jd(self, jd_id: str):
+        await self.collection.delete_many({"jd_id": ObjectId(jd_id)})
+
+
+ai_result_repository = AIResultRepository()
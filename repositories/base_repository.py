@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Tuple
+from db import db, ANALYTICS_READ_PREFERENCE
+
+TEXT_SCORE = {"$meta": "textScore"}
+
+# Set while the response cache fills a miss, so a body stored under the current
+# version is never read from a secondary that hasn't seen the write behind it yet
+_read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+
+@contextmanager
+def primary_reads():
+    token = _read_from_primary.set(True)
+    try:
+        yield
+    finally:
+        _read_from_primary.reset(token)
+
+
+class BaseRepository:
+    """Owns one collection; reads that tolerate replica lag go through `analytics`."""
+
+    collection_name: str
+
+    def __init__(self):
+        self.collection = db[self.collection_name]
+
+    @property
+    def analytics(self):
+        # Routed by MONGO_ANALYTICS_READ_PREFERENCE (secondaryPreferred by default),
+        # except inside primary_reads(), which covers every response-cache load
+        if _read_from_primary.get():
+            return self.collection
+        return self.collection.with_options(read_preference=ANALYTICS_READ_PREFERENCE)
+
+    async def text_search(
+        self, query_filter: Dict[str, Any], skip: int, limit: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        # Relevance-ranked page plus the total match count for pagination
+        total = await self.analytics.count_documents(query_filter)
+        cursor = (
+            self.analytics.find(query_filter, {"score": TEXT_SCORE})
+            .sort([("score", TEXT_SCORE)])
+            .skip(skip)
+            .limit(limit)
+        )
+        return [doc async for doc in cursor], total
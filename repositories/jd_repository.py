@@ -0,0 +1,86 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, TEXT, ReturnDocument
+from repositories.base_repository import BaseRepository
+
+
+class JDRepository(BaseRepository):
+    collection_name = "jd_history"
+
+    async def ensure_indexes(self):
+        # user_id prefix keeps every search scoped to one user's JDs
+        await self.collection.create_index(
+            [("user_id", ASCENDING), ("job_title", TEXT), ("job_description", TEXT)],
+            weights={"job_title": 5, "job_description": 1},
+            name="jd_text_search",
+        )
+
+    async def create(self, jd_doc: Dict[str, Any]) -> str:
+        result = await self.collection.insert_one(jd_doc)
+        return str(result.inserted_id)
+
+    async def find_for_user(self, jd_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": ObjectId(jd_id), "user_id": ObjectId(user_id)})
+
+    async def update_for_user(self, jd_id: str, user_id: str, fields: Dict[str, Any]) -> int:
+        result = await self.collection.update_one(
+            {"_id": ObjectId(jd_id), "user_id": ObjectId(user_id)},
+            {"$set": fields}
+        )
+        return result.modified_count
+
+    async def delete_for_user(self, jd_id: str, user_id: str) -> int:
+        result = await self.collection.delete_one({"_id": ObjectId(jd_id), "user_id": ObjectId(user_id)})
+        return result.deleted_count
+
+    async def add_resume_links(
+        self, jd_id: str, user_id: str, links: List[str], fields: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        # Links and the results they are expected to produce are added in one update
+        return await self.collection.find_one_and_update(
+            {"_id": ObjectId(jd_id), "user_id": ObjectId(user_id)},
+            {
+                "$push": {"resume_drive_links": {"$each": links}},
+                "$inc": {"expected_results": len(links)},
+                "$set": fields,
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def iter_history(self, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        cursor = self.analytics.find({"user_id": ObjectId(user_id)}).sort("created_at", -1)
+        async for jd in cursor:
+            yield jd
+
+    async def search_for_user(
+        self, user_id: str, query: str, skip: int, limit: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        return await self.text_search({"user_id": ObjectId(user_id), "$text": {"$search": query}}, skip, limit)
+
+    async def set_fields(
+        self, jd_id: str, fields: Dict[str, Any], expected_status: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        # With expected_status, nothing is written (and None returned) unless the JD is still in that state
+        query_filter: Dict[str, Any] = {"_id": ObjectId(jd_id)}
+        if expected_status is not None:
+            query_filter["status"] = expected_status
+        return await self.collection.find_one_and_update(
+            query_filter,
+            {"$set": fields},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def apply_pipeline_for_user(
+        self, jd_id: str, user_id: str, pipeline: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one_and_update(
+            {"_id": ObjectId(jd_id), "user_id": ObjectId(user_id)},
+            pipeline,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def watch(self, pipeline: List[Dict[str, Any]], **kwargs):
+        return self.collection.watch(pipeline, **kwargs)
+
+
+jd_repository = JDRepository()
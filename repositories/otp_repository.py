@@ -0,0 +1,24 @@
+from typing import Any, Dict, Optional
+from bson import ObjectId
+from repositories.base_repository import BaseRepository
+
+
+class OTPRepository(BaseRepository):
+    collection_name = "otp_temp"
+
+    async def create_pending_signup(self, email: str, name: str, password_hash: str, otp: str):
+        await self.collection.insert_one({
+            "email": email,
+            "name": name,
+            "password": password_hash,
+            "otp": otp
+        })
+
+    async def find_pending_signup(self, email: str, otp: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"email": email, "otp": otp})
+
+    async def delete(self, otp_id: ObjectId):
+        await self.collection.delete_one({"_id": otp_id})
+
+
+otp_repository = OTPRepository()
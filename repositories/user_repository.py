@@ -0,0 +1,28 @@
+from typing import Any, AsyncIterator, Dict, Optional
+from bson import ObjectId
+from repositories.base_repository import BaseRepository
+
+
+class UserRepository(BaseRepository):
+    collection_name = "users"
+
+    async def find_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"email": email})
+
+    async def find_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+
+    async def iter_password_hashes(self) -> AsyncIterator[str]:
+        async for user in self.collection.find({}, {"password": 1}):
+            yield user["password"]
+
+    async def create(self, name: str, email: str, password_hash: str) -> ObjectId:
+        result = await self.collection.insert_one({
+            "name": name,
+            "email": email,
+            "password": password_hash
+        })
+        return result.inserted_id
+
+
+user_repository = UserRepository()
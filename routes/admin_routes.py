@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Path
+from fastapi.responses import PlainTextResponse
+from profiling import is_admin_token, profile_store
+from typing import Optional
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# ✅ Admin endpoints are guarded by PROFILING_ADMIN_TOKEN rather than a user JWT
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+# ✅ Slowest captured profiles, without stacks
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    summaries = [
+        {key: value for key, value in profile.items() if key not in ("collapsed_stacks", "mongo_commands")}
+        for profile in profile_store.list()
+    ]
+    return {"profiles": summaries}
+
+
+# ✅ Full profile including Mongo command timings and collapsed stacks
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def get_profile(profile_id: str = Path(..., description="Profile ID from /admin/profiles")):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+# ✅ Collapsed stacks as plain text, ready for flamegraph.pl or speedscope
+@router.get("/profiles/{profile_id}/collapsed", dependencies=[Depends(require_admin)])
+def download_collapsed_stacks(profile_id: str = Path(..., description="Profile ID from /admin/profiles")):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        "\n".join(profile["collapsed_stacks"]) + "\n",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'},
+    )
+
+
+@router.delete("/profiles", dependencies=[Depends(require_admin)])
+def clear_profiles():
+    profile_store.clear()
+    return {"message": "Profiles cleared"}
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, HTTPException, Security, Path
+from fastapi import APIRouter, HTTPException, Security, Path, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.ai_result_model import AIResult
-from db import ai_results_collection
+from repositories.ai_result_repository import ai_result_repository
+from cache import ai_results_scope, cached_json_response, invalidate
+from jd_events import record_results
+from collections import Counter
 from utils import decode_access_token
 from bson import ObjectId
 from bson.errors import InvalidId
-from typing import List
+from typing import List, Optional
+from search import highlights_for, query_terms
 
 router = APIRouter(prefix="/ai", tags=["AI Results"])
 security = HTTPBearer()
@@ -38,15 +42,60 @@ async def store_bulk_ai_results(
             }
             docs.append(doc)
 
-        await ai_results_collection.insert_many(docs)
+        await ai_result_repository.insert_many(docs)
+        await invalidate(*{ai_results_scope(user_id, result.jd_id) for result in results})
+
+        for jd_id, count in Counter(result.jd_id for result in results).items():
+            await record_results(jd_id, user_id, count)
 
         return {"message": f"{len(docs)} AI results stored successfully"}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to store AI results: {str(e)}")
 
+# Declared before /results/{jd_id} so "search" isn't captured as a JD ID
+@router.get("/results/search")
+async def search_ai_results(
+    q: str = Query(..., min_length=1, max_length=200, description="Words or \"quoted phrases\" to search for"),
+    jd_id: Optional[str] = Query(None, description="Limit the search to one JD"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    user_id = payload.get("user_id")
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+    try:
+        docs, total = await ai_result_repository.search_for_user(
+            user_id, q, (page - 1) * page_size, page_size, jd_id=jd_id
+        )
+    except InvalidId:
+        raise HTTPException(status_code=400, detail=f"Invalid jd_id format. Got jd_id='{jd_id}'.")
+
+    terms = query_terms(q)
+    return {
+        "query": q,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "results": [{
+            "jd_id": str(doc["jd_id"]),
+            "name": doc["name"],
+            "skills_score": doc["skills_score"],
+            "jd_score": doc["jd_score"],
+            "overall_score": doc["overall_score"],
+            "score": round(doc["score"], 4),
+            "highlights": highlights_for(doc, ["name", "description"], terms)
+        } for doc in docs]
+    }
+
 @router.get("/results/{jd_id}")
 async def get_ai_results_for_jd(
+    request: Request,
     jd_id: str = Path(..., description="JD ID to fetch AI results for"),
     credentials: HTTPAuthorizationCredentials = Security(security)
 ):
@@ -57,14 +106,9 @@ async def get_ai_results_for_jd(
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    try:
-        cursor = ai_results_collection.find({
-            "jd_id": ObjectId(jd_id),
-            "user_id": ObjectId(user_id)
-        })
-
+    async def load_results():
         results = []
-        async for doc in cursor:
+        async for doc in ai_result_repository.iter_for_jd(jd_id, user_id):
             results.append({
                 "name": doc["name"],
                 "skills_score": doc["skills_score"],
@@ -75,11 +119,15 @@ async def get_ai_results_for_jd(
 
         return {"results": results}
 
+    try:
+        return await cached_json_response(request, ai_results_scope(user_id, jd_id), "results", load_results)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch AI results: {str(e)}")
 
 @router.get("/candidate-count/{jd_id}")
 async def get_candidate_count(
+    request: Request,
     jd_id: str = Path(..., description="JD ID to fetch candidate count for"),
     credentials: HTTPAuthorizationCredentials = Security(security)
 ):
@@ -90,14 +138,13 @@ async def get_candidate_count(
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    try:
-        query = {
-            "jd_id": ObjectId(jd_id),
-            "user_id": ObjectId(user_id)
-        }
-        count = await ai_results_collection.count_documents(query)
+    async def load_count():
+        count = await ai_result_repository.count_for_jd(jd_id, user_id)
         return {"count": count}
 
+    try:
+        return await cached_json_response(request, ai_results_scope(user_id, jd_id), "candidate-count", load_count)
+
     except InvalidId:
         raise HTTPException(
             status_code=400, 
@@ -4,9 +4,9 @@ import string
 from fastapi import APIRouter, HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.user_model import UserSignupInit, UserVerifyOTP, UserLogin
-from db import users_collection,otp_collection
+from repositories.user_repository import user_repository
+from repositories.otp_repository import otp_repository
 from utils import hash_password, verify_password, create_access_token, send_email_otp, decode_access_token
-from bson import ObjectId
 
 router = APIRouter(prefix="/auth")
 security = HTTPBearer()
@@ -34,49 +34,42 @@ async def signup_init(user: UserSignupInit):
             detail="Password must be at least 8 characters, include a digit and a special character."
         )
 
-    existing = await users_collection.find_one({"email": user.email.strip().lower()})
+    existing = await user_repository.find_by_email(user.email.strip().lower())
     if existing:
         raise HTTPException(status_code=400, detail="User already exists.")
 
-    async for existing_user in users_collection.find({}):
-        if verify_password(user.password, existing_user["password"]):
+    async for existing_hash in user_repository.iter_password_hashes():
+        if verify_password(user.password, existing_hash):
             raise HTTPException(status_code=400, detail="Password already in use. Please choose a different one.")
 
     otp = generate_otp()
     await send_email_otp(user.email.strip().lower(), otp)
 
-    await otp_collection.insert_one({
-        "email": user.email.strip().lower(),
-        "name": user.name.strip(),
-        "password": hash_password(user.password),
-        "otp": otp
-    })
+    await otp_repository.create_pending_signup(
+        email=user.email.strip().lower(),
+        name=user.name.strip(),
+        password_hash=hash_password(user.password),
+        otp=otp
+    )
 
     return {"message": f"OTP sent to {user.email}. Please verify to complete signup."}
 
 @router.post("/signup/verify")
 async def verify_signup(data: UserVerifyOTP):
-    record = await otp_collection.find_one({
-        "email": data.email.strip().lower(),
-        "otp": data.otp
-    })
+    record = await otp_repository.find_pending_signup(data.email.strip().lower(), data.otp)
 
     if not record:
         raise HTTPException(status_code=400, detail="Invalid OTP or email.")
 
-    await users_collection.insert_one({
-        "name": record["name"],
-        "email": record["email"],
-        "password": record["password"]
-    })
+    await user_repository.create(record["name"], record["email"], record["password"])
 
-    await otp_collection.delete_one({"_id": record["_id"]})
+    await otp_repository.delete(record["_id"])
 
     return {"message": "Signup verified successfully. You can now login."}
 
 @router.post("/login")
 async def login(user: UserLogin):
-    db_user = await users_collection.find_one({"email": user.email.strip().lower()})
+    db_user = await user_repository.find_by_email(user.email.strip().lower())
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials.")
 
@@ -100,7 +93,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = await users_collection.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+    user = await user_repository.find_profile(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
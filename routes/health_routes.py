@@ -0,0 +1,49 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from db import ping_db
+from utils import smtp_configured
+from routes.upload_to_drive import drive_status
+import routes.jd_routes as jd_routes
+from typing import Dict, Any
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+async def mongo_status() -> Dict[str, Any]:
+    try:
+        await ping_db()
+        return {"status": "ok"}
+    except Exception as e:
+        return {"status": "error", "error": str(e) or type(e).__name__}
+
+
+def ai_status() -> Dict[str, Any]:
+    # The webhook has no health endpoint, so report whether the pooled client is up
+    client_open = jd_routes.ai_client is not None and not jd_routes.ai_client.is_closed
+    return {"status": "ok" if client_open else "pending", "endpoint": jd_routes.AI_ENDPOINT}
+
+
+def smtp_status() -> Dict[str, Any]:
+    return {"status": "ok" if smtp_configured() else "not_configured"}
+
+
+# ✅ Liveness: the process is up and serving requests
+@router.get("")
+def liveness():
+    return {"status": "ok"}
+
+
+# ✅ Readiness: per-dependency report; only Mongo gates traffic
+@router.get("/ready")
+async def readiness():
+    checks = {
+        "mongo": await mongo_status(),
+        "drive": drive_status(),
+        "ai_webhook": ai_status(),
+        "smtp": smtp_status(),
+    }
+    ready = checks["mongo"]["status"] == "ok"
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks},
+    )
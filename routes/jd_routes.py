@@ -1,19 +1,50 @@
-from fastapi import APIRouter, HTTPException, Security, Path
+from fastapi import APIRouter, HTTPException, Security, Path, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from models.jd_model import JDInput # Ensure this is the updated model
+from models.jd_model import JDInput, JDStatus, TERMINAL_JD_STATUSES # Ensure this is the updated model
 from utils import decode_access_token
-from db import jd_collection
+from repositories.jd_repository import jd_repository
+from repositories.ai_result_repository import ai_result_repository
+from cache import ai_results_scope, cached_json_response, invalidate, jd_history_scope
+from jd_events import broker, ensure_change_stream_watcher, jd_progress_event, set_jd_status
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import os
+import time
 from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
 import httpx
-from typing import Dict, Any, List # Added for consistent type hinting
+from typing import Dict, Any, List, Optional # Added for consistent type hinting
 from pydantic import HttpUrl # <--- IMPORTANT: Ensure HttpUrl is imported if used in JDInput
+from metrics import EXTERNAL_CALL_LATENCY
+from search import highlights_for, query_terms
 
 router = APIRouter(prefix="/jd", tags=["JD"])
 security = HTTPBearer()
 
-# 👇 Replace this with your actual deployed AI endpoint if needed
-AI_ENDPOINT = "http://localhost:5678/webhook-test/b2d90787-cbb4-448c-93c5-6a31eacfa99a"
+# 👇 Replace this with your actual deployed AI endpoint if needed (or set AI_ENDPOINT in .env)
+AI_ENDPOINT = os.getenv("AI_ENDPOINT", "http://localhost:5678/webhook-test/b2d90787-cbb4-448c-93c5-6a31eacfa99a")
+
+# ✅ One pooled HTTP client for the AI webhook, opened by the app lifespan
+ai_client: Optional[httpx.AsyncClient] = None
+
+
+def get_ai_client() -> httpx.AsyncClient:
+    global ai_client
+    if ai_client is None:
+        ai_client = httpx.AsyncClient(timeout=30.0)
+    return ai_client
+
+
+async def close_ai_client():
+    global ai_client
+    if ai_client is not None:
+        await ai_client.aclose()
+        ai_client = None
+
+# Comment line sent on idle SSE streams so proxies don't drop the connection
+SSE_HEARTBEAT_SECONDS = 15
 
 
 async def notify_ai(jd_id: str, jd_data: JDInput, token: str):
@@ -26,8 +57,11 @@ async def notify_ai(jd_id: str, jd_data: JDInput, token: str):
             serialized_resume_links = [str(link) for link in jd_data.resume_drive_links]
         # --- END OF CHANGE IN notify_ai ---
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
+        # Only the webhook call is timed; its outcome comes from the HTTP status, not just from raising
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await get_ai_client().post(
                 AI_ENDPOINT,
                 json={
                     "jd_id": jd_id,
@@ -41,9 +75,29 @@ async def notify_ai(jd_id: str, jd_data: JDInput, token: str):
                     "Authorization": f"Bearer {token}"
                 }
             )
-            print(f"📨 AI Response {response.status_code}: {response.text}")
+            outcome = "success" if response.is_success else "error"
+        finally:
+            EXTERNAL_CALL_LATENCY.labels(operation="ai_notify", outcome=outcome).observe(
+                time.perf_counter() - start
+            )
+        print(f"📨 AI Response {response.status_code}: {response.text}")
+
+        # Only applied while the JD is still queued: the AI may already have stored results
+        if response.is_success and not serialized_resume_links:
+            # No resumes means no results will ever be stored, so there is nothing left to wait for
+            await set_jd_status(jd_id, JDStatus.COMPLETE, from_status=JDStatus.QUEUED)
+        elif response.is_success:
+            await set_jd_status(jd_id, JDStatus.DISPATCHED, from_status=JDStatus.QUEUED)
+        else:
+            await set_jd_status(
+                jd_id, JDStatus.FAILED, detail=f"AI webhook returned {response.status_code}",
+                from_status=JDStatus.QUEUED
+            )
     except Exception as e:
         print(f"⚠️ Failed to send JD to AI: {e}")
+        await set_jd_status(
+            jd_id, JDStatus.FAILED, detail=f"Failed to send JD to AI: {e}", from_status=JDStatus.QUEUED
+        )
 
 
 # ✅ Submit JD
@@ -70,8 +124,14 @@ async def submit_jd(
     if jd_doc.get("resume_drive_links") is None:
         jd_doc["resume_drive_links"] = [] 
 
-    result = await jd_collection.insert_one(jd_doc)
-    jd_id = str(result.inserted_id)
+    jd_doc["status"] = JDStatus.QUEUED.value
+    jd_doc["status_detail"] = None
+    jd_doc["status_updated_at"] = jd_doc["created_at"]
+    jd_doc["result_count"] = 0
+    jd_doc["expected_results"] = len(jd_doc["resume_drive_links"])
+
+    jd_id = await jd_repository.create(jd_doc)
+    await invalidate(jd_history_scope(user_id))
 
     # Call notify_ai with the original JDInput object, as it expects HttpUrl
     await notify_ai(jd_id, jd, token) # Pass the original jd object (JDInput type)
@@ -98,27 +158,24 @@ async def update_jd(
     if update_doc.get("resume_drive_links") is None:
         update_doc["resume_drive_links"] = [] 
 
-    result = await jd_collection.update_one(
-        {
-            "_id": ObjectId(jd_id),
-            "user_id": ObjectId(user_id)
-        },
-        {
-            "$set": {
-                "job_title": update_doc["job_title"],
-                "job_description": update_doc["job_description"],
-                "skills": update_doc["skills"],
-                "resume_drive_links": update_doc["resume_drive_links"], 
-                "created_at": datetime.utcnow() # Consider using 'updated_at' here
-            }
-        }
-    )
+    modified_count = await jd_repository.update_for_user(jd_id, user_id, {
+        "job_title": update_doc["job_title"],
+        "job_description": update_doc["job_description"],
+        "skills": update_doc["skills"],
+        "resume_drive_links": update_doc["resume_drive_links"], 
+        "created_at": datetime.utcnow(), # Consider using 'updated_at' here
+        "status": JDStatus.QUEUED.value,
+        "status_detail": None,
+        "status_updated_at": datetime.utcnow(),
+        "result_count": 0,
+        "expected_results": len(update_doc["resume_drive_links"])
+    })
 
-    if result.modified_count == 0:
+    if modified_count == 0:
         raise HTTPException(status_code=404, detail="JD not found or no changes made")
 
-    from db import ai_results_collection
-    await ai_results_collection.delete_many({"jd_id": ObjectId(jd_id)})
+    await ai_result_repository.delete_for_jd(jd_id)
+    await invalidate(jd_history_scope(user_id), ai_results_scope(user_id, jd_id))
 
     # Call notify_ai with the original JDInput object, as it expects HttpUrl
     await notify_ai(jd_id, updated_data, token) # Pass the original updated_data object (JDInput type)
@@ -128,34 +185,68 @@ async def update_jd(
 
 # ✅ Get JD History (sorted by most recent)
 @router.get("/history")
-async def get_jd_history(credentials: HTTPAuthorizationCredentials = Security(security)):
+async def get_jd_history(request: Request, credentials: HTTPAuthorizationCredentials = Security(security)):
     token = credentials.credentials
     user_id = decode_access_token(token).get("user_id")
 
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    history = []
-    cursor = jd_collection.find({"user_id": ObjectId(user_id)}).sort("created_at", -1)
-    
-    async for jd in cursor:
-        parsed_skills = {}
-        for skill, weight in jd.get("skills", {}).items():
-            if isinstance(weight, dict) and "$numberInt" in weight:
-                parsed_skills[skill] = int(weight["$numberInt"])
-            else:
-                parsed_skills[skill] = weight
-
-        history.append({
+    async def load_history():
+        history = []
+        async for jd in jd_repository.iter_history(user_id):
+            parsed_skills = {}
+            for skill, weight in jd.get("skills", {}).items():
+                if isinstance(weight, dict) and "$numberInt" in weight:
+                    parsed_skills[skill] = int(weight["$numberInt"])
+                else:
+                    parsed_skills[skill] = weight
+
+            history.append({
+                "jd_id": str(jd["_id"]),
+                "job_title": jd["job_title"],
+                "job_description": jd["job_description"],
+                "skills": parsed_skills,
+                "resume_drive_links": jd.get("resume_drive_links", []),
+                "created_at": jd.get("created_at")
+            })
+
+        return {"history": history}
+
+    return await cached_json_response(request, jd_history_scope(user_id), "history", load_history)
+
+
+# ✅ Full-text search over the caller's JD history (relevance-ranked, paginated)
+@router.get("/search")
+async def search_jd_history(
+    q: str = Query(..., min_length=1, max_length=200, description="Words or \"quoted phrases\" to search for"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    token = credentials.credentials
+    user_id = decode_access_token(token).get("user_id")
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    docs, total = await jd_repository.search_for_user(user_id, q, (page - 1) * page_size, page_size)
+    terms = query_terms(q)
+
+    return {
+        "query": q,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "results": [{
             "jd_id": str(jd["_id"]),
             "job_title": jd["job_title"],
-            "job_description": jd["job_description"],
-            "skills": parsed_skills,
-            "resume_drive_links": jd.get("resume_drive_links", []), 
-            "created_at": jd.get("created_at")
-        })
-
-    return {"history": history}
+            "skills": jd.get("skills", {}),
+            "created_at": jd.get("created_at"),
+            "score": round(jd["score"], 4),
+            "highlights": highlights_for(jd, ["job_title", "job_description"], terms)
+        } for jd in docs]
+    }
 
 
 # ✅ Delete JD
@@ -170,12 +261,66 @@ async def delete_jd(
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    result = await jd_collection.delete_one({
-        "_id": ObjectId(jd_id),
-        "user_id": ObjectId(user_id)
-    })
+    deleted_count = await jd_repository.delete_for_user(jd_id, user_id)
 
-    if result.deleted_count == 0:
+    if deleted_count == 0:
         raise HTTPException(status_code=404, detail="JD not found")
 
-    return {"message": "JD deleted successfully"}
\ No newline at end of file
+    await invalidate(jd_history_scope(user_id), ai_results_scope(user_id, jd_id))
+
+    return {"message": "JD deleted successfully"}
+
+
+# ✅ Stream JD processing progress as Server-Sent Events
+@router.get("/{jd_id}/events")
+async def stream_jd_events(
+    request: Request,
+    jd_id: str = Path(..., description="JD ID to stream progress for"),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    token = credentials.credentials
+    user_id = decode_access_token(token).get("user_id")
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    # Subscribe before reading the snapshot so no transition can slip in between
+    ensure_change_stream_watcher()
+    queue = broker.subscribe(jd_id)
+
+    try:
+        jd = await jd_repository.find_for_user(jd_id, user_id)
+    except InvalidId:
+        broker.unsubscribe(jd_id, queue)
+        raise HTTPException(status_code=400, detail=f"Invalid jd_id format. Got jd_id='{jd_id}'.")
+    except Exception:
+        broker.unsubscribe(jd_id, queue)
+        raise
+    if not jd:
+        broker.unsubscribe(jd_id, queue)
+        raise HTTPException(status_code=404, detail="JD not found")
+
+    def format_event(event: Dict[str, Any]) -> str:
+        return f"event: progress\ndata: {json.dumps(event, default=str)}\n\n"
+
+    async def event_stream():
+        try:
+            event = jd_progress_event(jd)
+            yield format_event(event)
+
+            while event["status"] not in TERMINAL_JD_STATUSES:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                    yield format_event(event)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+        finally:
+            broker.unsubscribe(jd_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
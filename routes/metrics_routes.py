@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+import os
+
+router = APIRouter(tags=["Metrics"])
+
+
+def metrics_registry():
+    # Under several workers, aggregate the per-process files prometheus_client writes
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+# ✅ Prometheus scrape endpoint
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
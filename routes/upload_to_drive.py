@@ -1,15 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Security, Path
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Security, Path
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 import os
+import io
 import uuid
+import asyncio
 import logging
+import mimetypes
+import threading
+import zipfile
+import posixpath
 from dotenv import load_dotenv
 import tempfile
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Load environment variables from .env file
 load_dotenv()
@@ -24,6 +32,13 @@ router = APIRouter(prefix="/upload", tags=["Drive Upload"])
 # Assuming 'decode_access_token' utility is available in 'utils' module
 # You need to ensure 'utils.py' is accessible and contains 'decode_access_token'
 from utils import decode_access_token
+from metrics import track_external
+from repositories.jd_repository import jd_repository
+from cache import invalidate, jd_history_scope
+from rate_limit import charge_user
+from jd_events import attach_resume_links, set_jd_status
+from models.jd_model import JDInput, JDStatus
+from routes.jd_routes import notify_ai
 
 # This defines a security scheme for Bearer tokens, consistent with your other routes
 security = HTTPBearer()
@@ -38,32 +53,85 @@ CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
 CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET')
 REFRESH_TOKEN = os.getenv('GOOGLE_REFRESH_TOKEN')
 FOLDER_ID = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
-
-if not CLIENT_ID:
-    raise ValueError("Environment variable 'GOOGLE_CLIENT_ID' not set in .env or environment. Please set it after creating OAuth credentials.")
-if not CLIENT_SECRET:
-    raise ValueError("Environment variable 'GOOGLE_CLIENT_SECRET' not set in .env or environment. Please set it after creating OAuth credentials.")
-if not REFRESH_TOKEN:
-    raise ValueError("Environment variable 'GOOGLE_REFRESH_TOKEN' not set in .env or environment. Please run the 'get_refresh_token.py' script first.")
-if not FOLDER_ID:
-    raise ValueError("Environment variable 'GOOGLE_DRIVE_FOLDER_ID' not set in .env or environment. Please provide the ID of your target Google Drive folder.")
+# Overridable so benchmarks can point Drive at a local stand-in
+TOKEN_URI = os.getenv('GOOGLE_TOKEN_URI', 'https://oauth2.googleapis.com/token')
+DRIVE_API_ENDPOINT = os.getenv('GOOGLE_DRIVE_API_ENDPOINT')
+
+# Google env vars are only checked when Drive is first used, so the app can start without them
+REQUIRED_DRIVE_SETTINGS = {
+    'GOOGLE_CLIENT_ID': "Please set it after creating OAuth credentials.",
+    'GOOGLE_CLIENT_SECRET': "Please set it after creating OAuth credentials.",
+    'GOOGLE_REFRESH_TOKEN': "Please run the 'get_refresh_token.py' script first.",
+    'GOOGLE_DRIVE_FOLDER_ID': "Please provide the ID of your target Google Drive folder.",
+}
+
+def missing_drive_settings() -> List[str]:
+    values = {
+        'GOOGLE_CLIENT_ID': CLIENT_ID,
+        'GOOGLE_CLIENT_SECRET': CLIENT_SECRET,
+        'GOOGLE_REFRESH_TOKEN': REFRESH_TOKEN,
+        'GOOGLE_DRIVE_FOLDER_ID': FOLDER_ID,
+    }
+    return [name for name in REQUIRED_DRIVE_SETTINGS if not values[name]]
 
 credentials = None
 drive_service = None
+drive_last_error = None
+
+# ✅ ZIP archive ingestion limits
+ARCHIVE_MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "500"))
+ARCHIVE_MAX_MEMBER_BYTES = int(os.getenv("ARCHIVE_MAX_MEMBER_BYTES", str(10 * 1024 * 1024)))
+ARCHIVE_UPLOAD_CONCURRENCY = int(os.getenv("ARCHIVE_UPLOAD_CONCURRENCY", "4"))
+ARCHIVE_ALLOWED_EXTENSIONS = {
+    ext.strip().lower() for ext in os.getenv("ARCHIVE_ALLOWED_EXTENSIONS", ".pdf,.doc,.docx,.txt,.rtf,.odt").split(",")
+    if ext.strip()
+}
+# Drive accepts single-request (multipart) uploads up to 5 MB; larger files go resumable
+DRIVE_MULTIPART_MAX_BYTES = 5 * 1024 * 1024
+
+# httplib2 is not thread-safe, so each worker thread gets its own authorized connection
+_thread_local = threading.local()
+
+def _authorized_http():
+    cached = getattr(_thread_local, "drive_http", None)
+    if cached is None or cached[0] is not credentials:
+        cached = (credentials, AuthorizedHttp(credentials, http=httplib2.Http()))
+        _thread_local.drive_http = cached
+    return cached[1]
+
+def build_drive_service(creds):
+    client_options = {"api_endpoint": DRIVE_API_ENDPOINT} if DRIVE_API_ENDPOINT else None
+    return build('drive', 'v3', credentials=creds, client_options=client_options)
+
+# Archive uploads call Drive from several worker threads; only one should (re)authenticate at a time
+_credentials_lock = threading.Lock()
 
 def get_drive_credentials():
-    global credentials, drive_service
+    with _credentials_lock:
+        return _get_drive_credentials()
+
+def _get_drive_credentials():
+    global credentials, drive_service, drive_last_error
 
     if credentials and credentials.valid:
         return credentials
 
+    missing = missing_drive_settings()
+    if missing:
+        name = missing[0]
+        drive_last_error = f"Environment variable '{name}' not set in .env or environment. {REQUIRED_DRIVE_SETTINGS[name]}"
+        logger.error(drive_last_error)
+        raise HTTPException(status_code=503, detail=f"Google Drive is not configured: {drive_last_error}")
+
     if credentials and credentials.expired and credentials.refresh_token:
         try:
             credentials.refresh(Request())
             logger.info("Google Drive access token refreshed successfully.")
-            drive_service = build('drive', 'v3', credentials=credentials)
+            drive_service = build_drive_service(credentials)
+            drive_last_error = None
             return credentials
         except Exception as e:
+            drive_last_error = str(e)
             logger.error(f"Error refreshing Google Drive access token: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to refresh Google Drive access token: {e}")
 
@@ -72,29 +140,40 @@ def get_drive_credentials():
             credentials = Credentials(
                 token=None,
                 refresh_token=REFRESH_TOKEN,
-                token_uri='https://oauth2.googleapis.com/token',
+                token_uri=TOKEN_URI,
                 client_id=CLIENT_ID,
                 client_secret=CLIENT_SECRET,
                 scopes=SCOPES
             )
             credentials.refresh(Request())
             logger.info("Initial Google Drive credentials created and access token obtained.")
-            drive_service = build('drive', 'v3', credentials=credentials)
+            drive_service = build_drive_service(credentials)
+            drive_last_error = None
             return credentials
         except Exception as e:
+            credentials = None
+            drive_last_error = str(e)
             logger.error(f"Failed to create initial Google Drive credentials or obtain access token: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to authenticate with Google Drive: {e}")
 
-try:
-    get_drive_credentials()
-except HTTPException as e:
-    logger.critical(f"Application startup failed due to Google Drive authentication error: {e.detail}")
-    raise
-
-def upload_file_to_drive(file_path: str, filename: str) -> str:
-    get_drive_credentials()
-
-    media = MediaFileUpload(file_path, resumable=True)
+# ✅ Called in the background from the app lifespan; failures are retried on first real use
+def warm_drive():
+    try:
+        get_drive_credentials()
+    except HTTPException as e:
+        logger.warning(f"Google Drive warm-up failed, will retry on first use: {e.detail}")
+
+def drive_status() -> Dict[str, Any]:
+    missing = missing_drive_settings()
+    if missing:
+        return {"status": "not_configured", "missing": missing}
+    if drive_last_error:
+        return {"status": "error", "error": drive_last_error}
+    if credentials:
+        return {"status": "ok"}
+    return {"status": "pending"}
+
+def _create_drive_file(media, filename: str) -> str:
     file_metadata = {
         'name': filename,
         'parents': [FOLDER_ID]
@@ -104,14 +183,31 @@ def upload_file_to_drive(file_path: str, filename: str) -> str:
             body=file_metadata,
             media_body=media,
             fields='id, webViewLink'
-        ).execute()
+        ).execute(http=_authorized_http())
         logger.info(f"File '{filename}' uploaded to Drive. Link: {uploaded_file.get('webViewLink')}")
         return uploaded_file.get("webViewLink")
     except Exception as e:
         logger.error(f"Error uploading file '{filename}' to Drive: {e}")
         raise HTTPException(status_code=500, detail=f"Error uploading file to Google Drive: {e}")
 
+@track_external("drive_upload")
+def upload_file_to_drive(file_path: str, filename: str) -> str:
+    get_drive_credentials()
+
+    media = MediaFileUpload(file_path, resumable=True)
+    return _create_drive_file(media, filename)
+
+# ✅ Upload in-memory content (e.g. a ZIP member) without writing a temp file
+@track_external("drive_upload")
+def upload_bytes_to_drive(data: bytes, filename: str, mimetype: Optional[str] = None) -> str:
+    get_drive_credentials()
+
+    mimetype = mimetype or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mimetype, resumable=len(data) > DRIVE_MULTIPART_MAX_BYTES)
+    return _create_drive_file(media, filename)
+
 # ✅ NEW: Function to delete a file from Google Drive
+@track_external("drive_delete")
 def delete_file_from_drive(file_id: str):
     """
     Deletes a file from Google Drive by its file ID.
@@ -120,7 +216,7 @@ def delete_file_from_drive(file_id: str):
 
     try:
         # The .delete() method returns None on success for Drive API v3
-        drive_service.files().delete(fileId=file_id).execute()
+        drive_service.files().delete(fileId=file_id).execute(http=_authorized_http())
         logger.info(f"File with ID '{file_id}' deleted from Google Drive.")
     except Exception as e:
         logger.error(f"Error deleting file with ID '{file_id}' from Drive: {e}")
@@ -172,7 +268,7 @@ async def upload_multiple_files(
                 buffer.write(contents)
             logger.info(f"Temporary file saved for '{file.filename}' at: {file_location}")
 
-            link = upload_file_to_drive(file_location, file.filename)
+            link = await asyncio.to_thread(upload_file_to_drive, file_location, file.filename)
             uploaded_links.append({"filename": file.filename, "link": link})
 
         except Exception as e:
@@ -196,6 +292,131 @@ async def upload_multiple_files(
     return {"message": "File upload process completed.", "results": uploaded_links}
 
 
+def _archive_skip_reason(info: zipfile.ZipInfo) -> Optional[str]:
+    name = posixpath.basename(info.filename)
+    if info.is_dir():
+        return "directory"
+    if not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+        return "hidden or metadata file"
+    if info.flag_bits & 0x1:
+        return "encrypted"
+    if posixpath.splitext(name)[1].lower() not in ARCHIVE_ALLOWED_EXTENSIONS:
+        return "file type not allowed"
+    if info.file_size > ARCHIVE_MAX_MEMBER_BYTES:
+        return f"larger than {ARCHIVE_MAX_MEMBER_BYTES} bytes"
+    return None
+
+def _upload_archive_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    # Runs in a worker thread: decompress one member into memory and send it to Drive.
+    # Reading one byte past the limit catches members whose header understates their size.
+    with archive.open(info) as member:
+        data = member.read(ARCHIVE_MAX_MEMBER_BYTES + 1)
+    if len(data) > ARCHIVE_MAX_MEMBER_BYTES:
+        raise ValueError(f"Member expands beyond {ARCHIVE_MAX_MEMBER_BYTES} bytes")
+    return upload_bytes_to_drive(data, posixpath.basename(info.filename))
+
+
+# ✅ API endpoint to ingest a ZIP of resumes in one round trip
+@router.post("/archive")
+async def upload_archive(
+    archive: UploadFile = File(..., description="ZIP archive of resumes"),
+    jd_id: Optional[str] = Form(None, description="Optional JD to attach the uploaded links to"),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+) -> Dict[str, Any]:
+    """
+    Uploads every eligible member of a ZIP archive to Google Drive.
+    Requires authentication via a Bearer token.
+
+    Members are decompressed in memory (never extracted to disk) and uploaded by
+    a bounded pool of worker threads. Directories, hidden files, disallowed types
+    and oversized members are reported as skipped. Every eligible member costs one
+    token from the caller's upload rate-limit bucket. When `jd_id` is given, the
+    resulting links are appended to that JD's `resume_drive_links` and sent to
+    the AI for scoring.
+    """
+    token = credentials.credentials
+    user_id = decode_access_token(token).get("user_id")
+
+    if not user_id:
+        logger.warning("Authentication failed for archive upload: Invalid token or user_id not found.")
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if jd_id and not await jd_repository.find_for_user(jd_id, user_id):
+        raise HTTPException(status_code=404, detail="JD not found")
+
+    logger.info(f"Archive upload '{archive.filename}' received from authenticated user: {user_id}")
+
+    try:
+        # The upload is already spooled by Starlette; this only reads the central directory
+        zip_file = await asyncio.to_thread(zipfile.ZipFile, archive.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Uploaded file is not a valid ZIP archive.")
+
+    with zip_file:
+        members = zip_file.infolist()
+        if len(members) > ARCHIVE_MAX_MEMBERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Archive has {len(members)} entries; at most {ARCHIVE_MAX_MEMBERS} are allowed."
+            )
+
+        # Each eligible member is one Drive upload, so it costs what a file sent to /upload/ does
+        await charge_user(user_id, "upload", sum(1 for info in members if not _archive_skip_reason(info)))
+
+        semaphore = asyncio.Semaphore(ARCHIVE_UPLOAD_CONCURRENCY)
+
+        async def process(info: zipfile.ZipInfo) -> Dict[str, Any]:
+            reason = _archive_skip_reason(info)
+            if reason:
+                return {"filename": info.filename, "skipped": reason}
+            async with semaphore:
+                try:
+                    link = await asyncio.to_thread(_upload_archive_member, zip_file, info)
+                    return {"filename": info.filename, "link": link}
+                except HTTPException as e:
+                    return {"filename": info.filename, "error": str(e.detail)}
+                except Exception as e:
+                    logger.error(f"An error occurred during upload of archive member '{info.filename}': {e}")
+                    return {"filename": info.filename, "error": str(e)}
+
+        results = await asyncio.gather(*(process(info) for info in members))
+
+    links = [result["link"] for result in results if result.get("link")]
+    attached_jd = None
+    if jd_id and links:
+        # None when the JD was deleted while the archive was uploading
+        attached_jd = await attach_resume_links(jd_id, user_id, links)
+
+    if attached_jd:
+        await invalidate(jd_history_scope(user_id))
+        try:
+            # Only the new links are sent; the AI already has the JD's earlier ones
+            new_links_jd = JDInput(
+                job_title=attached_jd["job_title"],
+                job_description=attached_jd["job_description"],
+                skills=attached_jd.get("skills", {}),
+                resume_drive_links=links,
+            )
+        except ValueError as e:
+            logger.error(f"Could not send archive links for JD {jd_id} to AI: {e}")
+            await set_jd_status(
+                jd_id, JDStatus.FAILED, detail=f"Failed to send JD to AI: {e}", from_status=JDStatus.QUEUED
+            )
+        else:
+            await notify_ai(jd_id, new_links_jd, token)
+    elif jd_id and links:
+        logger.warning(f"JD {jd_id} no longer exists; archive links were not attached.")
+
+    return {
+        "message": "Archive upload process completed.",
+        "uploaded": len(links),
+        "skipped": sum(1 for result in results if "skipped" in result),
+        "failed": sum(1 for result in results if "error" in result),
+        "jd_id": jd_id if attached_jd else None,
+        "results": results,
+    }
+
+
 # ✅ NEW: API endpoint to delete a file from Google Drive
 @router.delete("/{drive_file_id}")
 async def delete_drive_file(
@@ -0,0 +1,70 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+SNIPPET_CHARS = 160
+
+# Suffixes stripped so a query term also highlights its inflections, roughly as Mongo's stemmer matches them
+_SUFFIXES = ("ing", "ers", "ed", "er", "es", "s")
+
+
+# ✅ Turn a $text search string into the terms worth highlighting
+def query_terms(query: str) -> List[str]:
+    # A leading "-" negates a phrase just like a word; $text excludes those, so they are never highlighted
+    phrases = [phrase for negated, phrase in re.findall(r'(-?)"([^"]+)"', query) if not negated]
+    remainder = re.sub(r'-?"[^"]*"', " ", query)
+    words = [word for word in remainder.split() if not word.startswith("-")]
+    return [term.strip().lower() for term in phrases + words if term.strip()]
+
+
+def _term_pattern(term: str) -> str:
+    if " " in term:
+        return re.escape(term)
+    stem = term
+    for suffix in _SUFFIXES:
+        if stem.endswith(suffix) and len(stem) - len(suffix) >= 3:
+            stem = stem[: -len(suffix)]
+            break
+    return r"\b" + re.escape(stem) + r"\w*"
+
+
+def _match_spans(text: str, terms: List[str]) -> List[Tuple[int, int]]:
+    if not terms:
+        return []
+    pattern = re.compile("|".join(_term_pattern(term) for term in terms), re.IGNORECASE)
+    return [match.span() for match in pattern.finditer(text)]
+
+
+# ✅ Snippet around the first match, with match offsets relative to the snippet
+def highlight(text: str, terms: List[str], snippet_chars: int = SNIPPET_CHARS) -> Dict[str, Any]:
+    spans = _match_spans(text, terms)
+    if not spans:
+        return {}
+
+    first_start = spans[0][0]
+    start = max(0, first_start - snippet_chars // 3)
+    end = min(len(text), start + snippet_chars)
+    # Don't cut words in half at either edge
+    if start > 0:
+        space = text.find(" ", start)
+        start = space + 1 if 0 <= space < first_start else start
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        end = space if space > spans[0][1] else end
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    offset = len(prefix) - start
+    matches = [[s + offset, e + offset] for s, e in spans if s >= start and e <= end]
+    return {"snippet": prefix + text[start:end] + suffix, "matches": matches}
+
+
+def highlights_for(doc: Dict[str, Any], fields: List[str], terms: List[str]) -> List[Dict[str, Any]]:
+    result = []
+    for field in fields:
+        value = doc.get(field)
+        if not isinstance(value, str):
+            continue
+        snippet = highlight(value, terms)
+        if snippet:
+            result.append({"field": field, **snippet})
+    return result
@@ -9,6 +9,8 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional # Added for Optional type hint
+import asyncio
+from metrics import track_external
 
 # ✅ Load environment variables
 load_dotenv()
@@ -47,7 +49,16 @@ def decode_access_token(token: str) -> dict:
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+# ✅ SMTP settings (connections are opened per message; Gmail drops idle ones)
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+
+def smtp_configured() -> bool:
+    return bool(os.getenv("SMTP_SENDER_EMAIL") and os.getenv("SMTP_SENDER_PASSWORD"))
+
 # ✅ Send OTP email using Gmail SMTP
+@track_external("smtp_send_otp")
 async def send_email_otp(to_email: str, otp: str):
     sender_email = os.getenv("SMTP_SENDER_EMAIL")
     sender_password = os.getenv("SMTP_SENDER_PASSWORD")
@@ -70,10 +81,15 @@ async def send_email_otp(to_email: str, otp: str):
 
     msg.attach(MIMEText(body, "html"))
 
-    try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
+    def deliver():
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
+            if SMTP_STARTTLS:
+                server.starttls()
             server.login(sender_email, sender_password)
             server.send_message(msg)
+
+    try:
+        # smtplib blocks, so keep it off the event loop
+        await asyncio.to_thread(deliver)
     except Exception as e:
         raise Exception(f"Failed to send OTP email: {str(e)}")
\ No newline at end of file